@@ -170,6 +170,13 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 
+# ETL tasks are long-running and I/O-bound: reserve one task per process so
+# short tasks never queue behind a minutes-long offload already prefetched by
+# the same worker (pair with -Ofair on the worker command), and only ack
+# after completion so interrupted tasks are redelivered.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+
 # --- Timezone & Beat (schedule nightly) ---
 CELERY_TIMEZONE = "Asia/Kolkata"
 CELERY_ENABLE_UTC = False  # so crontab uses IST directly
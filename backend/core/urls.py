@@ -14,39 +14,40 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from importlib import import_module
+
 from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 from rest_framework.routers import DefaultRouter
 
-from etl.views import MappingVersionViewSet, BoardCredentialViewSet
-from core.views import HealthView, PingView
-from etl.views import ETLTriggerView, RawStorageOpsView, ValidatorTriggerView, SLABlockedCheckTrigger, \
-            NotificationChannelViewSet, RemediationNotifyTriggerView, MappingMatrixValidateView, SnapshotTriggerView, SLABlockedBackfillTrigger
-from metrics.views import (
-    BoardTimeseriesView, BoardWIPView, BoardReviewTimeseriesView, UserLeaderboardView, BoardViewSet
-)
-from metrics.views_team_metrics import (
-    TeamSummaryView, TeamTimeseriesView, TeamBoardsView
-)
+# Router registration needs the viewset classes at import time; every other
+# view is referenced lazily (see lazy_view) so cold start and management
+# commands don't pay for the whole metrics/etl view stack.
+from etl.views import MappingVersionViewSet, BoardCredentialViewSet, NotificationChannelViewSet
+from metrics.views import BoardViewSet
 
-from metrics.views_user_metrics import (
-    UserSelfSummaryView, UserSelfTimeseriesView, UserSelfWIPView,
-    UserSummaryView, UserTimeseriesView, UserWIPView
-)
 
-from metrics.views_workitems import (
-    WorkItemSearchView, WorkItemDetailView, WorkItemByKeyView, WorkItemFacetView
-)
-from etl.views_admin import (
-    AdminRunETLView, AdminETLStatusView, AdminETLJobsListView, AdminETLJobDetailView, AdminETLCancelView
-)
+def lazy_view(dotted: str):
+    """
+    Return a view callable that imports `dotted` (module.ClassName) and calls
+    .as_view() on first request, caching the result. Keeps core.urls import
+    light under runserver autoreload and short-lived manage.py commands.
+    """
+    view = None
 
-from metrics.views_remediation import (
-    RemediationTicketListView, RemediationTicketDetailView, RemediationTicketUpdateView,
-    RemediationTicketBulkActionView, ComplianceSummaryView
-)
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            module_path, name = dotted.rsplit(".", 1)
+            view = getattr(import_module(module_path), name).as_view()
+        return view(request, *args, **kwargs)
 
+    # DRF's as_view() marks its callable csrf_exempt (DRF enforces CSRF
+    # itself via SessionAuthentication); carry the marker so
+    # CsrfViewMiddleware doesn't 403 token-authenticated POSTs.
+    wrapper.csrf_exempt = True
+    return wrapper
 
 
 def health(request):
@@ -59,60 +60,86 @@ router.register(r"admin/mappings", MappingVersionViewSet, basename="mappingversi
 router.register(r"admin/credentials", BoardCredentialViewSet, basename="boardcredential")
 router.register(r"admin/notify/channels", NotificationChannelViewSet, basename="notifychannel")
 
+# router.urls is a property that rebuilds the pattern list on every access;
+# freeze it once at import so autoreload/worker recycles reuse the same objects.
+router_urls = list(router.urls)
+
+# Patterns are grouped by shared prefix so the resolver can skip whole
+# subtrees on a prefix mismatch instead of scanning every pattern, and the
+# groups are ordered hottest-first (dashboard metrics and work items serve
+# the bulk of traffic; admin triggers fire a few times a day) so the linear
+# walk usually stops early.
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path("api/", include(router.urls)),
+    path("api/", include(router_urls)),
     # Health (public)
-    path("api/health/", HealthView.as_view(), name="health"),
+    path("api/health/", lazy_view("core.views.HealthView"), name="health"),
 
     # Auth (JWT + profile)
     path("api/auth/", include("users.urls")),
 
     # Simple protected ping
-    path("api/ping/", PingView.as_view(), name="ping"),
-    path("api/admin/etl/run/", ETLTriggerView.as_view(), name="etl_trigger"),
-    path("api/admin/raw-storage/run/", RawStorageOpsView.as_view(), name="raw_storage_ops"),
-    path("api/admin/validator/run/", ValidatorTriggerView.as_view(), name="validator_trigger"),
-    path("api/admin/remediation/notify/", RemediationNotifyTriggerView.as_view(), name="remediation_notify"),
-    path("api/admin/mapping/validate/", MappingMatrixValidateView.as_view(), name="mapping_validate"),
-    path("api/admin/snapshots/run/", SnapshotTriggerView.as_view(), name="snapshot_trigger"),
-    path("api/metrics/boards/<int:board_id>/timeseries", BoardTimeseriesView.as_view(), name="metrics_board_timeseries"),
-    path("api/metrics/boards/<int:board_id>/wip",        BoardWIPView.as_view(),       name="metrics_board_wip"),
-    path("api/metrics/boards/<int:board_id>/review",     BoardReviewTimeseriesView.as_view(), name="metrics_board_review"),
-    path("api/metrics/boards/<int:board_id>/users/leaderboard", UserLeaderboardView.as_view(), name="metrics_user_leaderboard"),
-    path("api/admin/sla/blocked/check/", SLABlockedCheckTrigger.as_view(), name="sla_blocked_check"),
-    path("api/admin/sla/blocked/backfill/", SLABlockedBackfillTrigger.as_view(), name="sla_blocked_backfill"),
-    path("api/metrics/teams/<int:team_id>/timeseries", TeamTimeseriesView.as_view(), name="metrics_team_timeseries"),
-    path("api/metrics/teams/<int:team_id>/summary",    TeamSummaryView.as_view(),    name="metrics_team_summary"),
-    path("api/metrics/users/self/summary",    UserSelfSummaryView.as_view(),    name="user_metrics_self_summary"),
-    path("api/metrics/users/self/timeseries", UserSelfTimeseriesView.as_view(), name="user_metrics_self_timeseries"),
-    path("api/metrics/users/self/wip",        UserSelfWIPView.as_view(),        name="user_metrics_self_wip"),
+    path("api/ping/", lazy_view("core.views.PingView"), name="ping"),
+
+    path("api/metrics/boards/<int:board_id>/", include([
+        path("timeseries", lazy_view("metrics.views.BoardTimeseriesView"), name="metrics_board_timeseries"),
+        path("wip",        lazy_view("metrics.views.BoardWIPView"),        name="metrics_board_wip"),
+        path("review",     lazy_view("metrics.views.BoardReviewTimeseriesView"), name="metrics_board_review"),
+        path("users/leaderboard", lazy_view("metrics.views.UserLeaderboardView"), name="metrics_user_leaderboard"),
+    ])),
+
+    path("api/metrics/teams/<int:team_id>/", include([
+        path("timeseries", lazy_view("metrics.views_team_metrics.TeamTimeseriesView"), name="metrics_team_timeseries"),
+        path("summary",    lazy_view("metrics.views_team_metrics.TeamSummaryView"),    name="metrics_team_summary"),
+        path("boards",     lazy_view("metrics.views_team_metrics.TeamBoardsView"),     name="metrics_team_boards"),
+    ])),
+
+    path("api/metrics/users/self/", include([
+        path("summary",    lazy_view("metrics.views_user_metrics.UserSelfSummaryView"),    name="user_metrics_self_summary"),
+        path("timeseries", lazy_view("metrics.views_user_metrics.UserSelfTimeseriesView"), name="user_metrics_self_timeseries"),
+        path("wip",        lazy_view("metrics.views_user_metrics.UserSelfWIPView"),        name="user_metrics_self_wip"),
+    ])),
 
     # arbitrary user (private; requires PROCESS/CTO/ADMIN unless querying self)
-    path("api/metrics/users/<str:uid>/summary",    UserSummaryView.as_view(),    name="user_metrics_summary"),
-    path("api/metrics/users/<str:uid>/timeseries", UserTimeseriesView.as_view(), name="user_metrics_timeseries"),
-    path("api/metrics/users/<str:uid>/wip",        UserWIPView.as_view(),        name="user_metrics_wip"),
-    
-    path("api/workitems/search", WorkItemSearchView.as_view(), name="workitem_search"),
-    path("api/workitems/by-key", WorkItemByKeyView.as_view(), name="workitem_by_key"),
-    path("api/workitems/<int:pk>", WorkItemDetailView.as_view(), name="workitem_detail"),
-    path("api/workitems/facets", WorkItemFacetView.as_view(), name="workitem_facets"),
-    
-    path("api/admin/etl/run",    AdminRunETLView.as_view(),        name="etl_run"),
-    path("api/admin/etl/status", AdminETLStatusView.as_view(),     name="etl_status"),
-    path("api/admin/etl/jobs",   AdminETLJobsListView.as_view(),   name="etl_jobs"),
-    path("api/admin/etl/jobs/<int:job_id>", AdminETLJobDetailView.as_view(), name="etl_job_detail"),
-    path("api/admin/etl/cancel", AdminETLCancelView.as_view(),     name="etl_cancel"),   # optional
-    
-    
-    # Tickets
-    path("api/remediation/tickets",          RemediationTicketListView.as_view(),   name="rt_list"),
-    path("api/remediation/tickets/<int:pk>", RemediationTicketDetailView.as_view(), name="rt_detail"),
-    path("api/remediation/tickets/<int:pk>/update", RemediationTicketUpdateView.as_view(), name="rt_update"),
-    path("api/remediation/tickets/bulk",     RemediationTicketBulkActionView.as_view(),    name="rt_bulk"),
-
-    # Compliance snapshot
-    path("api/remediation/compliance",       ComplianceSummaryView.as_view(),       name="rt_compliance"),
-    
-    path("api/metrics/teams/<int:team_id>/boards", TeamBoardsView.as_view(), name="metrics_team_boards"),
+    path("api/metrics/users/<str:uid>/", include([
+        path("summary",    lazy_view("metrics.views_user_metrics.UserSummaryView"),    name="user_metrics_summary"),
+        path("timeseries", lazy_view("metrics.views_user_metrics.UserTimeseriesView"), name="user_metrics_timeseries"),
+        path("wip",        lazy_view("metrics.views_user_metrics.UserWIPView"),        name="user_metrics_wip"),
+    ])),
+
+    path("api/workitems/", include([
+        path("search", lazy_view("metrics.views_workitems.WorkItemSearchView"), name="workitem_search"),
+        path("by-key", lazy_view("metrics.views_workitems.WorkItemByKeyView"), name="workitem_by_key"),
+        path("<int:pk>", lazy_view("metrics.views_workitems.WorkItemDetailView"), name="workitem_detail"),
+        path("facets", lazy_view("metrics.views_workitems.WorkItemFacetView"), name="workitem_facets"),
+    ])),
+
+    path("api/remediation/", include([
+        # Tickets
+        path("tickets",          lazy_view("metrics.views_remediation.RemediationTicketListView"),   name="rt_list"),
+        path("tickets/<int:pk>", lazy_view("metrics.views_remediation.RemediationTicketDetailView"), name="rt_detail"),
+        path("tickets/<int:pk>/update", lazy_view("metrics.views_remediation.RemediationTicketUpdateView"), name="rt_update"),
+        path("tickets/bulk",     lazy_view("metrics.views_remediation.RemediationTicketBulkActionView"), name="rt_bulk"),
+
+        # Compliance snapshot
+        path("compliance",       lazy_view("metrics.views_remediation.ComplianceSummaryView"),       name="rt_compliance"),
+    ])),
+
+    path("api/admin/", include([
+        path("etl/", include([
+            path("run/",  lazy_view("etl.views.ETLTriggerView"),  name="etl_trigger"),
+            path("run",    lazy_view("etl.views_admin.AdminRunETLView"),      name="etl_run"),
+            path("status", lazy_view("etl.views_admin.AdminETLStatusView"),   name="etl_status"),
+            path("jobs",   lazy_view("etl.views_admin.AdminETLJobsListView"), name="etl_jobs"),
+            path("jobs/<int:job_id>", lazy_view("etl.views_admin.AdminETLJobDetailView"), name="etl_job_detail"),
+            path("cancel", lazy_view("etl.views_admin.AdminETLCancelView"),   name="etl_cancel"),   # optional
+        ])),
+        path("raw-storage/run/", lazy_view("etl.views.RawStorageOpsView"), name="raw_storage_ops"),
+        path("validator/run/", lazy_view("etl.views.ValidatorTriggerView"), name="validator_trigger"),
+        path("remediation/notify/", lazy_view("etl.views.RemediationNotifyTriggerView"), name="remediation_notify"),
+        path("mapping/validate/", lazy_view("etl.views.MappingMatrixValidateView"), name="mapping_validate"),
+        path("snapshots/run/", lazy_view("etl.views.SnapshotTriggerView"), name="snapshot_trigger"),
+        path("sla/blocked/check/", lazy_view("etl.views.SLABlockedCheckTrigger"), name="sla_blocked_check"),
+        path("sla/blocked/backfill/", lazy_view("etl.views.SLABlockedBackfillTrigger"), name="sla_blocked_backfill"),
+    ])),
 ]
@@ -1,29 +1,41 @@
 # etl/connectors/github.py
 from __future__ import annotations
+import asyncio
+import random
 import time
 import datetime as dt
-from typing import List, Dict, Any, Optional, Iterable, Tuple
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 
-import requests
+import httpx
+import orjson
 from django.utils import timezone
 from django.conf import settings
 
-from metrics.models import Board
-from etl.models import BoardCredential
+from metrics.models import Board, RawPayload
+from etl.models import BoardCredential, GitHubEtagCache
+from etl.connectors.base import RawItem
+
+_UTC = dt.timezone.utc
 
 
 class GitHubConnector:
     """
     GitHub PR connector (REST v3).
-    - Incremental via Search API (PRs updated since ts)
-    - PR details via /repos/{owner}/{repo}/pulls/{number}
+    - Incremental via /repos/{owner}/{repo}/pulls?sort=updated&direction=desc
+      with an early exit at the since_ts watermark (the list endpoint already
+      carries the full PR body, so no per-PR detail call is needed, and it
+      bills against the 5000/hr core bucket instead of the 30/min search one)
     - Reviews via /repos/{owner}/{repo}/pulls/{number}/reviews
+    Per-PR review fetches run concurrently via httpx.AsyncClient.
     Emits:
-      { "object_type": "pr", "external_id": "<owner/repo>#<number>", "payload": { "repo":{...}, "pr":{...}, "reviews":[...] } }
+      RawItem(object_type="pr", external_id="<owner/repo>#<number>",
+              payload={"repo": {...}, "pr": {...}, "reviews": [...]})
     """
 
-    SEARCH_PAGE_SIZE = 100  # max for /search
-    REQUESTS_PER_MINUTE_BACKOFF = 60  # crude backoff when rate-limited
+    PAGE_SIZE = 100  # max for /pulls
+    REQUESTS_PER_MINUTE_BACKOFF = 60  # fallback when no reset header is present
+    MAX_RATE_LIMIT_RETRIES = 6
+    MAX_CONCURRENT_PRS = 8
 
     def __init__(self, board: Board):
         if board.source != "github":
@@ -34,102 +46,211 @@ class GitHubConnector:
             raise RuntimeError(f"No credentials found for board {board}")
 
         self.base = (self.cred.api_base_url or "https://api.github.com").rstrip("/")
-        self.session = requests.Session()
-        token = self.cred.get_token()
+        token = self.cred.token
         if not token:
             raise RuntimeError("GitHub credential token is missing")
-        self.session.headers.update({
+        self.headers = {
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
-        })
-        self.timeout = (10, 60)
+        }
+        self.timeout = httpx.Timeout(60, connect=10)
+        # HTTP/2 multiplexes the per-PR detail/review fan-out over one TLS
+        # connection instead of queueing on a small TCP pool.
+        self.limits = httpx.Limits(max_keepalive_connections=32, max_connections=64,
+                                   keepalive_expiry=60)
+        self.session = httpx.Client(http2=True, headers=self.headers,
+                                    timeout=self.timeout, limits=self.limits)
 
         # resolve repos to scan
         self.org, self.repos = self._resolve_scope()
+        # hoisted out of the per-repo walk so the settings getattr happens once
+        self.lookback_days = int(getattr(settings, "GITHUB_LOOKBACK_DAYS", 14))
 
     # ----------------------------- Public entry ------------------------------
-    def fetch_since(self, since_ts: Optional[dt.datetime] = None) -> List[Dict[str, Any]]:
+    def fetch_since(self, since_ts: Optional[dt.datetime] = None) -> List[RawItem]:
+        """Materialized wrapper kept for callers that need a list."""
+        return list(self.iter_since(since_ts=since_ts))
+
+    def iter_since(self, since_ts: Optional[dt.datetime] = None) -> Iterator[RawItem]:
         """
-        Return list of dicts shaped for RawPayload creation by ETL.
+        Stream PR bundles repo by repo; peak memory stays at one repo's
+        changed PRs instead of the full multi-repo snapshot.
         """
-        items: List[Dict[str, Any]] = []
-        if not self.repos:
-            return items
-
         for repo in self.repos:
             owner, name = repo.split("/", 1)
-            pr_numbers = self._search_pr_numbers_updated_since(owner, name, since_ts)
-            for num in pr_numbers:
-                pr = self._get_pr(owner, name, num)
-                if not pr:
-                    continue
-                reviews = self._get_reviews(owner, name, num)
-                items.append({
-                    "object_type": "pr",
-                    "external_id": f"{owner}/{name}#{num}",
-                    "payload": {
+            prs = self._list_prs_updated_since(owner, name, since_ts)
+            if not prs:
+                continue
+            numbers = [pr["number"] for pr in prs]
+            etags = self._load_review_etags(owner, name, numbers)
+            results = asyncio.run(self._fetch_reviews(owner, name, numbers, etags))
+            self._store_review_etags(owner, name, results)
+            # 304s carry no body; their reviews are recovered from the last
+            # RawPayload row in one bulk query.
+            unchanged = [num for num, reviews, _e, _lm in results if reviews is None]
+            cached_reviews = self._load_cached_reviews(owner, name, unchanged)
+            reviews_by_number = {
+                num: (reviews if reviews is not None else cached_reviews.get(num, []))
+                for num, reviews, _e, _lm in results
+            }
+            for pr in prs:
+                num = pr["number"]
+                yield RawItem(
+                    object_type="pr",
+                    external_id=f"{owner}/{name}#{num}",
+                    payload={
                         "repo": {"owner": owner, "name": name},
                         "pr": pr,
-                        "reviews": reviews,
-                    }
-                })
-        return items
+                        "reviews": reviews_by_number.get(num, []),
+                    },
+                )
 
-    # ----------------------------- Search -----------------------------------
-    def _search_pr_numbers_updated_since(self, owner: str, repo: str, since_ts: Optional[dt.datetime]) -> List[int]:
+    # ----------------------------- PR discovery ------------------------------
+    def _list_prs_updated_since(self, owner: str, repo: str, since_ts: Optional[dt.datetime]) -> List[Dict[str, Any]]:
         """
-        Use the Search API to find PR numbers updated since ts.
-        Query: repo:<owner>/<repo> is:pr updated:>=YYYY-MM-DDTHH:MM:SSZ
+        Walk /pulls sorted by updated desc and stop at the first PR older than
+        since_ts; everything past the watermark is untouched since the last
+        sync, so the walk costs O(changed PRs), not O(all PRs).
         """
         if not since_ts:
             # default small lookback to avoid huge scans
-            lookback_days = int(getattr(settings, "GITHUB_LOOKBACK_DAYS", 14))
-            since_ts = timezone.now() - dt.timedelta(days=lookback_days)
+            since_ts = timezone.now() - dt.timedelta(days=self.lookback_days)
+        elif since_ts.tzinfo is None:
+            # Plain tzinfo check instead of timezone.is_naive/make_aware
+            # skips Django's settings lookup.
+            since_ts = since_ts.replace(tzinfo=_UTC)
 
-        ts = self._to_iso_z(since_ts)
-        query = f"repo:{owner}/{repo} is:pr updated:>={ts}"
         page = 1
-        numbers: List[int] = []
-
+        prs: List[Dict[str, Any]] = []
+        seen: set = set()
         while True:
-            data = self._request_json(
+            rows = self._request_json(
                 "GET",
-                f"/search/issues",
-                params={"q": query, "per_page": self.SEARCH_PAGE_SIZE, "page": page}
+                f"/repos/{owner}/{repo}/pulls",
+                params={"state": "all", "sort": "updated", "direction": "desc",
+                        "per_page": self.PAGE_SIZE, "page": page}
             )
-            items = data.get("items", [])
-            for it in items:
-                if it.get("pull_request"):  # ensure it's a PR result
-                    # URL like https://api.github.com/repos/<owner>/<repo>/issues/<number>
-                    numbers.append(int(it["number"]))
-            if len(items) < self.SEARCH_PAGE_SIZE or len(numbers) >= 1000:
+            if not isinstance(rows, list) or not rows:
+                break
+            hit_watermark = False
+            for pr in rows:
+                updated = self._parse_iso_z(pr.get("updated_at"))
+                if updated and updated < since_ts:
+                    hit_watermark = True
+                    break
+                # single-pass de-dup in walk order: a PR updated mid-walk can
+                # shift between updated-sorted pages and appear twice
+                num = pr.get("number")
+                if num in seen:
+                    continue
+                seen.add(num)
+                prs.append(pr)
+            if hit_watermark or len(rows) < self.PAGE_SIZE:
                 break
             page += 1
+        return prs
 
-        # de-dup and sort ascending (oldest first)
-        numbers = sorted(list(set(numbers)))
-        return numbers
+    # ----------------------------- Reviews -----------------------------------
+    async def _fetch_reviews(self, owner: str, repo: str, numbers: List[int],
+                             etags: Dict[int, Tuple[str, str]]) -> List[Tuple[int, Optional[List[Dict[str, Any]]], str, str]]:
+        """
+        Fetch reviews for each PR concurrently, capped at MAX_CONCURRENT_PRS
+        in-flight so we stay clear of abuse limits. Each result is
+        (number, reviews-or-None-on-304, etag, last_modified).
+        """
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_PRS)
+        async with httpx.AsyncClient(http2=True, headers=self.headers,
+                                     timeout=self.timeout, limits=self.limits) as client:
+            async def fetch_one(num: int):
+                async with sem:
+                    return await self._aget_reviews(client, owner, repo, num, etags.get(num))
 
-    # ----------------------------- Details & reviews -------------------------
-    def _get_pr(self, owner: str, repo: str, number: int) -> Optional[Dict[str, Any]]:
-        return self._request_json("GET", f"/repos/{owner}/{repo}/pulls/{number}")
+            return await asyncio.gather(*(fetch_one(n) for n in numbers))
 
-    def _get_reviews(self, owner: str, repo: str, number: int) -> List[Dict[str, Any]]:
+    async def _aget_reviews(self, client: httpx.AsyncClient, owner: str, repo: str, number: int,
+                            cached: Optional[Tuple[str, str]] = None) -> Tuple[int, Optional[List[Dict[str, Any]]], str, str]:
         page = 1
         out: List[Dict[str, Any]] = []
+        etag = last_modified = ""
+        url = f"{self.base}/repos/{owner}/{repo}/pulls/{number}/reviews"
+        attempt = 0
         while True:
-            rows = self._request_json(
-                "GET",
-                f"/repos/{owner}/{repo}/pulls/{number}/reviews",
-                params={"per_page": 100, "page": page}
-            )
+            headers = None
+            if page == 1 and cached:
+                # Conditional request: a 304 costs one rate-limit unit and
+                # ~200 bytes instead of the full body.
+                headers = {}
+                if cached[0]:
+                    headers["If-None-Match"] = cached[0]
+                if cached[1]:
+                    headers["If-Modified-Since"] = cached[1]
+            resp = await client.get(url, params={"per_page": 100, "page": page}, headers=headers)
+            if page == 1 and resp.status_code == 304:
+                return number, None, cached[0], cached[1]
+            sleep_for = self._rate_limit_sleep(resp, attempt)
+            if sleep_for is not None and attempt < self.MAX_RATE_LIMIT_RETRIES:
+                attempt += 1
+                await asyncio.sleep(sleep_for)
+                continue
+            self._raise_for_status(resp)
+            attempt = 0
+            if page == 1:
+                etag = resp.headers.get("ETag", "")
+                last_modified = resp.headers.get("Last-Modified", "")
+            rows = self._json(resp)
             if not isinstance(rows, list):
                 break
             out.extend(rows)
             if len(rows) < 100:
                 break
             page += 1
+        return number, out, etag, last_modified
+
+    # ----------------------------- ETag cache --------------------------------
+    @staticmethod
+    def _external_id(owner: str, repo: str, number: int) -> str:
+        return f"{owner}/{repo}#{number}"
+
+    def _load_review_etags(self, owner: str, repo: str, numbers: List[int]) -> Dict[int, Tuple[str, str]]:
+        ids = {self._external_id(owner, repo, n): n for n in numbers}
+        rows = GitHubEtagCache.objects.filter(
+            board=self.board, external_id__in=ids
+        ).values_list("external_id", "etag", "last_modified")
+        return {ids[eid]: (etag, lm) for eid, etag, lm in rows}
+
+    def _store_review_etags(self, owner: str, repo: str,
+                            results: List[Tuple[int, Optional[List[Dict[str, Any]]], str, str]]):
+        rows = [
+            GitHubEtagCache(
+                board=self.board,
+                external_id=self._external_id(owner, repo, num),
+                etag=etag or "",
+                last_modified=lm or "",
+            )
+            for num, _reviews, etag, lm in results if etag or lm
+        ]
+        if rows:
+            GitHubEtagCache.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                update_fields=["etag", "last_modified", "updated_at"],
+                unique_fields=["board", "external_id"],
+            )
+
+    def _load_cached_reviews(self, owner: str, repo: str, numbers: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        if not numbers:
+            return {}
+        ids = {self._external_id(owner, repo, n): n for n in numbers}
+        out: Dict[int, List[Dict[str, Any]]] = {}
+        # newest raw row per PR still holds the reviews from the previous sync
+        qs = RawPayload.objects.filter(
+            board=self.board, object_type="pr", external_id__in=ids
+        ).order_by("external_id", "-fetched_at").values_list("external_id", "payload")
+        for eid, payload in qs:
+            num = ids[eid]
+            if num not in out:
+                out[num] = (payload or {}).get("reviews") or []
         return out
 
     # ----------------------------- Helpers -----------------------------------
@@ -156,37 +277,73 @@ class GitHubConnector:
                 normalized = [str(self.board.board_id)]
         return org, normalized
 
-    def _to_iso_z(self, ts: dt.datetime) -> str:
-        if timezone.is_naive(ts):
-            ts = timezone.make_aware(ts, timezone.get_current_timezone())
-        return ts.astimezone(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    @staticmethod
+    def _parse_iso_z(value: Optional[str]) -> Optional[dt.datetime]:
+        # GitHub timestamps look like "2024-01-31T12:34:56Z"
+        if not value:
+            return None
+        try:
+            return dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _json(resp: httpx.Response):
+        # orjson decodes the raw bytes directly (no intermediate str);
+        # GitHub bodies may be a dict (PR detail) or a list (reviews page).
+        return orjson.loads(resp.content)
+
+    def _rate_limit_sleep(self, resp: httpx.Response, attempt: int = 0) -> Optional[float]:
+        """
+        Return seconds to sleep when rate-limited, else None.
+        Covers Retry-After, the primary limit (X-RateLimit-Remaining=0) and
+        secondary/abuse limits (403 without the header); every path carries
+        jitter so a fleet of workers doesn't wake at the reset in lockstep.
+        """
+        if resp.status_code not in (403, 429):
+            return None
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), 120) + random.uniform(0, 1)
+            except ValueError:
+                pass
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            reset = resp.headers.get("X-RateLimit-Reset")
+            sleep_for = self.REQUESTS_PER_MINUTE_BACKOFF
+            try:
+                if reset:
+                    # sleep until reset (seconds since epoch)
+                    sleep_for = max(1, int(reset) - int(time.time()) + 1)
+            except Exception:
+                pass
+            return min(sleep_for, 120) + random.uniform(0, 5)
+        if b"secondary rate limit" in resp.content[:500].lower():
+            # exponential backoff with jitter, as GitHub's docs prescribe
+            return min(2 ** attempt + random.uniform(0, 1), 60)
+        return None
+
+    def _raise_for_status(self, resp: httpx.Response):
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            detail = ""
+            try:
+                detail = f" | body={resp.content[:500].decode('utf-8', errors='replace')}"
+            except Exception:
+                pass
+            raise httpx.HTTPStatusError(
+                f"GitHub API error {resp.status_code} at {resp.url}{detail}",
+                request=resp.request, response=resp,
+            ) from e
 
     def _request_json(self, method: str, path: str, params: Optional[Dict[str, Any]] = None, json: Any = None):
         url = f"{self.base}{path}"
-        while True:
-            resp = self.session.request(method, url, params=params, json=json, timeout=self.timeout)
-            # Basic rate-limit handling
-            if resp.status_code == 403 and resp.headers.get("X-RateLimit-Remaining") == "0":
-                reset = resp.headers.get("X-RateLimit-Reset")
-                sleep_for = self.REQUESTS_PER_MINUTE_BACKOFF
-                try:
-                    if reset:
-                        # sleep until reset (seconds since epoch)
-                        reset_ts = int(reset)
-                        now = int(time.time())
-                        sleep_for = max(1, reset_ts - now + 1)
-                except Exception:
-                    pass
-                time.sleep(min(sleep_for, 120))
-                continue
-            try:
-                resp.raise_for_status()
-            except requests.HTTPError as e:
-                detail = ""
-                try:
-                    detail = f" | body={resp.text[:500]}"
-                except Exception:
-                    pass
-                raise requests.HTTPError(f"GitHub API error {resp.status_code} at {resp.url}{detail}") from e
-            data = resp.json()
-            return data
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES):
+            resp = self.session.request(method, url, params=params, json=json)
+            sleep_for = self._rate_limit_sleep(resp, attempt)
+            if sleep_for is None:
+                break
+            time.sleep(sleep_for)
+        self._raise_for_status(resp)
+        return self._json(resp)
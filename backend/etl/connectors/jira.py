@@ -1,15 +1,28 @@
 # etl/connectors/jira.py
 from __future__ import annotations
+import asyncio
 import datetime as dt
-from typing import List, Dict, Any, Optional, Iterable, Tuple
-import requests
-from requests.auth import HTTPBasicAuth
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+import httpx
+import orjson
 
 from django.utils import timezone
 from django.conf import settings
 
 from metrics.models import Board
 from etl.models import BoardCredential
+from etl.connectors.base import RawItem
+
+_UTC = dt.timezone.utc
+
+try:
+    from itertools import batched  # Python 3.12+: C-implemented chunking
+except ImportError:
+    def batched(iterable, n):
+        seq = list(iterable)
+        for i in range(0, len(seq), n):
+            yield tuple(seq[i : i + n])
 
 
 class JiraConnector:
@@ -18,12 +31,16 @@ class JiraConnector:
     Supports:
       - Incremental issue fetch via JQL 'updated >= "<ISO>"'
       - Sprint list via Agile API (if board_id is numeric Agile board id)
-    Returns items in the ETL-orchestration format:
-      [{ "object_type": "issue", "external_id": "<key>", "payload": {...}}, ...]
-      [{ "object_type": "sprint", "external_id": "<id>",  "payload": {...}}, ...]
+    The first /search page reveals `total`, so the remaining pages are fetched
+    concurrently instead of walking offsets one round trip at a time.
+    Yields items in the ETL-orchestration format:
+      RawItem(object_type="issue",  external_id="<key>", payload={...})
+      RawItem(object_type="sprint", external_id="<id>",  payload={...})
     """
 
     ISSUE_PAGE_SIZE = 100
+    SPRINT_PAGE_SIZE = 50
+    MAX_CONCURRENT_PAGES = 6
     # Default fields to request from /rest/api/3/search
     DEFAULT_FIELDS = getattr(settings, "JIRA_DEFAULT_FIELDS", [
         "summary", "issuetype", "status", "assignee", "reporter", "created",
@@ -41,49 +58,52 @@ class JiraConnector:
             raise RuntimeError(f"No credentials found for board {board}")
 
         self.base = self.cred.api_base_url.rstrip("/")
-        self.session = requests.Session()
-        if self.cred.auth_type == "pat":
-            self.session.auth = HTTPBasicAuth(self.cred.username or "", self.cred.get_token())
-        else:
-            # Extend for OAuth if needed
-            self.session.auth = HTTPBasicAuth(self.cred.username or "", self.cred.get_token())
+        # Basic auth for both 'pat' and 'basic'; extend for OAuth if needed
+        self.auth = (self.cred.username or "", self.cred.token)
 
         # Timeouts & headers
-        self.session.headers.update({
-            "Accept": "application/json"
-        })
-        self.timeout = (10, 60)  # (connect, read)
+        self.headers = {
+            "Accept": "application/json",
+        }
+        self.timeout = httpx.Timeout(60, connect=10)
+        # HTTP/2 multiplexes the concurrent /search pages over one TLS
+        # connection instead of queueing on a small TCP pool.
+        self.limits = httpx.Limits(max_keepalive_connections=32, max_connections=64,
+                                   keepalive_expiry=60)
+        self.session = httpx.Client(http2=True, auth=self.auth, headers=self.headers,
+                                    timeout=self.timeout, limits=self.limits)
 
     # -----------------------------
     # Public API (used by ETL tasks)
     # -----------------------------
-    def fetch_since(self, since_ts: Optional[dt.datetime] = None) -> List[Dict[str, Any]]:
+    def fetch_since(self, since_ts: Optional[dt.datetime] = None) -> List[RawItem]:
+        """Materialized wrapper kept for callers that need a list."""
+        return list(self.iter_since(since_ts=since_ts))
+
+    def iter_since(self, since_ts: Optional[dt.datetime] = None) -> Iterator[RawItem]:
         """
-        Fetch issues updated since 'since_ts' + sprints for the board (if board_id numeric).
-        Returns a list of dicts suitable for RawPayload creation by the ETL task.
+        Stream issues updated since 'since_ts' + sprints for the board (if
+        board_id numeric); peak memory stays at one /search page window
+        instead of the full project snapshot.
         """
-        items: List[Dict[str, Any]] = []
-
         # 1) Issues (JQL incremental)
         jql, using_project = self._build_incremental_jql(since_ts)
         for issue in self._search_issues_paginated(jql=jql, fields=self.DEFAULT_FIELDS, expand=self.DEFAULT_EXPAND):
             key = issue.get("key") or issue.get("id")
-            items.append({
-                "object_type": "issue",
-                "external_id": str(key),
-                "payload": issue,
-            })
+            yield RawItem(
+                object_type="issue",
+                external_id=str(key),
+                payload=issue,
+            )
 
         # 2) Sprints (if we have a numeric Agile board id)
         if self._is_numeric_board_id(self.board.board_id):
             for sprint in self._list_sprints(board_id=int(self.board.board_id)):
-                items.append({
-                    "object_type": "sprint",
-                    "external_id": str(sprint.get("id")),
-                    "payload": sprint,
-                })
-
-        return items
+                yield RawItem(
+                    object_type="sprint",
+                    external_id=str(sprint.get("id")),
+                    payload=sprint,
+                )
 
     # -----------------------------
     # Issue search helpers
@@ -95,15 +115,7 @@ class JiraConnector:
         Otherwise, fall back to updated >= without project filter (works but heavier).
         Returns (jql, using_project_scope)
         """
-        # Format Jira datetime string: "YYYY/MM/DD HH:MM"
-        def fmt(ts: dt.datetime) -> str:
-            # ensure timezone-aware, convert to UTC for Jira
-            if timezone.is_naive(ts):
-                ts = timezone.make_aware(ts, timezone.get_current_timezone())
-            ts_utc = ts.astimezone(dt.timezone.utc)
-            return ts_utc.strftime("%Y/%m/%d %H:%M")
-
-        updated_clause = f'updated >= "{fmt(since_ts)}"' if since_ts else None
+        updated_clause = f'updated >= "{self._to_jira_dt(since_ts)}"' if since_ts else None
 
         project_key = (self.board.meta or {}).get("project_key")
         if not project_key and not self._is_numeric_board_id(self.board.board_id):
@@ -120,58 +132,126 @@ class JiraConnector:
         return jql, bool(project_key)
 
     def _search_issues_paginated(self, jql: str, fields: Iterable[str], expand: Iterable[str]) -> Iterable[Dict[str, Any]]:
-        start_at = 0
-        while True:
-            batch = self._search_issues(jql=jql, fields=fields, expand=expand, start_at=start_at, max_results=self.ISSUE_PAGE_SIZE)
-            issues = batch.get("issues", [])
-            for it in issues:
-                yield it
-            if len(issues) < self.ISSUE_PAGE_SIZE:
-                break
-            start_at += self.ISSUE_PAGE_SIZE
+        # Page 0 synchronously to learn `total`; all later offsets are then
+        # known up-front and fetched concurrently, one window at a time so
+        # peak memory stays at MAX_CONCURRENT_PAGES pages (a changelog-heavy
+        # page can run 5-50 MB) instead of the whole project.
+        params = self._search_params(jql, fields, expand)
+        first = self._search_issues(params, start_at=0)
+        total = int(first.get("total") or 0)
+        yield from first.get("issues", [])
+        del first
 
-    def _search_issues(self, jql: str, fields: Iterable[str], expand: Iterable[str], start_at: int, max_results: int) -> Dict[str, Any]:
-        url = f"{self.base}/rest/api/3/search"
+        if total > self.ISSUE_PAGE_SIZE:
+            offsets = range(self.ISSUE_PAGE_SIZE, total, self.ISSUE_PAGE_SIZE)
+            for window in batched(offsets, self.MAX_CONCURRENT_PAGES):
+                for batch in asyncio.run(self._search_pages_async(params, list(window))):
+                    yield from batch
+
+    def _search_params(self, jql: str, fields: Iterable[str], expand: Iterable[str]) -> Dict[str, Any]:
         params = {
             "jql": jql,
-            "startAt": start_at,
-            "maxResults": max_results,
-            "fields": ",".join(fields) if fields else None,
-            "expand": ",".join(expand) if expand else None,
+            "maxResults": self.ISSUE_PAGE_SIZE,
         }
-        resp = self.session.get(url, params=params, timeout=self.timeout)
+        if fields:
+            params["fields"] = ",".join(fields)
+        if expand:
+            params["expand"] = ",".join(expand)
+        return params
+
+    def _search_issues(self, params: Dict[str, Any], start_at: int) -> Dict[str, Any]:
+        url = f"{self.base}/rest/api/3/search"
+        resp = self.session.get(url, params={**params, "startAt": start_at})
         self._raise_for_status(resp)
-        return resp.json()
+        return self._json(resp)
+
+    async def _search_pages_async(self, params: Dict[str, Any], offsets: List[int]) -> List[List[Dict[str, Any]]]:
+        # Callers cap the window at MAX_CONCURRENT_PAGES, which also bounds
+        # how many in-flight pages sit in memory at once.
+        url = f"{self.base}/rest/api/3/search"
+        async with httpx.AsyncClient(http2=True, auth=self.auth, headers=self.headers,
+                                     timeout=self.timeout, limits=self.limits) as client:
+            async def fetch_one(start_at: int) -> List[Dict[str, Any]]:
+                resp = await client.get(url, params={**params, "startAt": start_at})
+                self._raise_for_status(resp)
+                data = self._json(resp)
+                return data.get("issues", [])
+
+            return await asyncio.gather(*(fetch_one(s) for s in offsets))
 
     # -----------------------------
     # Sprints (Agile API)
     # -----------------------------
     def _list_sprints(self, board_id: int) -> List[Dict[str, Any]]:
         """
-        List sprints for an Agile board (Scrum/Kanban). Paginates until done.
+        List sprints for an Agile board (Scrum/Kanban).
         GET /rest/agile/1.0/board/{boardId}/sprint
+        The first page is fetched synchronously; if the response carries
+        `total`, the remaining offsets are gathered concurrently, otherwise
+        the walk falls back to the sequential isLast protocol.
         """
         url = f"{self.base}/rest/agile/1.0/board/{board_id}/sprint"
-        start_at = 0
-        per_page = 50
-        all_rows: List[Dict[str, Any]] = []
+        base_params = {"maxResults": self.SPRINT_PAGE_SIZE, "state": "active,future,closed"}
+
+        resp = self.session.get(url, params={**base_params, "startAt": 0})
+        self._raise_for_status(resp)
+        data = self._json(resp)
+        all_rows: List[Dict[str, Any]] = list(data.get("values", []))
+        if data.get("isLast", len(all_rows) < self.SPRINT_PAGE_SIZE):
+            return all_rows
+
+        total = data.get("total")
+        if total:
+            offsets = list(range(self.SPRINT_PAGE_SIZE, int(total), self.SPRINT_PAGE_SIZE))
+            for batch in asyncio.run(self._sprint_pages_async(url, base_params, offsets)):
+                all_rows.extend(batch)
+            return all_rows
 
+        # Sequential fallback when the server omits `total`
+        start_at = self.SPRINT_PAGE_SIZE
         while True:
-            params = {"startAt": start_at, "maxResults": per_page, "state": "active,future,closed"}
-            resp = self.session.get(url, params=params, timeout=self.timeout)
+            resp = self.session.get(url, params={**base_params, "startAt": start_at})
             self._raise_for_status(resp)
-            data = resp.json() or {}
+            data = self._json(resp)
             values = data.get("values", [])
             all_rows.extend(values)
-            if len(values) < per_page:
+            if data.get("isLast", len(values) < self.SPRINT_PAGE_SIZE):
                 break
-            start_at += per_page
+            start_at += self.SPRINT_PAGE_SIZE
 
         return all_rows
 
+    async def _sprint_pages_async(self, url: str, base_params: Dict[str, Any], offsets: List[int]) -> List[List[Dict[str, Any]]]:
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_PAGES)
+        async with httpx.AsyncClient(http2=True, auth=self.auth, headers=self.headers,
+                                     timeout=self.timeout, limits=self.limits) as client:
+            async def fetch_one(start_at: int) -> List[Dict[str, Any]]:
+                async with sem:
+                    resp = await client.get(url, params={**base_params, "startAt": start_at})
+                self._raise_for_status(resp)
+                data = self._json(resp)
+                return data.get("values", [])
+
+            return await asyncio.gather(*(fetch_one(s) for s in offsets))
+
     # -----------------------------
     # Utils
     # -----------------------------
+    @staticmethod
+    def _to_jira_dt(ts: dt.datetime) -> str:
+        # Jira JQL datetime: "YYYY/MM/DD HH:MM" in UTC. Plain tzinfo check
+        # instead of timezone.is_naive/make_aware skips Django's settings
+        # lookup on the per-sync path.
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=_UTC)
+        return ts.astimezone(_UTC).strftime("%Y/%m/%d %H:%M")
+
+    @staticmethod
+    def _json(resp: httpx.Response) -> Dict[str, Any]:
+        # orjson decodes the raw bytes directly (no intermediate str),
+        # which matters on 50-500KB issue+changelog payloads.
+        return orjson.loads(resp.content) or {}
+
     def _is_numeric_board_id(self, value: str) -> bool:
         try:
             int(value)
@@ -179,13 +259,16 @@ class JiraConnector:
         except (TypeError, ValueError):
             return False
 
-    def _raise_for_status(self, resp: requests.Response):
+    def _raise_for_status(self, resp: httpx.Response):
         try:
             resp.raise_for_status()
-        except requests.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             detail = ""
             try:
-                detail = f" | body={resp.text[:500]}"
+                detail = f" | body={resp.content[:500].decode('utf-8', errors='replace')}"
             except Exception:
                 pass
-            raise requests.HTTPError(f"Jira API error {resp.status_code} at {resp.url}{detail}") from e
+            raise httpx.HTTPStatusError(
+                f"Jira API error {resp.status_code} at {resp.url}{detail}",
+                request=resp.request, response=resp,
+            ) from e
@@ -1,8 +1,12 @@
 import base64, os
+from functools import lru_cache
 from cryptography.fernet import Fernet, InvalidToken
 from django.conf import settings
 
+@lru_cache(maxsize=None)
 def _get_fernet() -> Fernet:
+    # Memoized: key derivation + Fernet construction (HMAC/AES setup) happens
+    # once per process instead of on every encrypt/decrypt call.
     key = getattr(settings, "CREDENTIALS_FERNET_KEY", None)
     if not key:
         # For dev only: derive from SECRET_KEY (do NOT do this in prod)
@@ -12,14 +16,22 @@ def _get_fernet() -> Fernet:
         key = base64.urlsafe_b64encode(key.encode()[:32].ljust(32, b"0"))
     return Fernet(key)
 
-def encrypt_value(plain: str) -> bytes:
+def encrypt_value(plain: str) -> str:
+    # Fernet tokens are URL-safe base64 already, so they are stored as text
+    # and skip the BYTEA escape/memoryview round-trip on every read.
     if plain is None:
-        return b""
-    return _get_fernet().encrypt(plain.encode())
+        return ""
+    return _get_fernet().encrypt(plain.encode()).decode("ascii")
 
-def decrypt_value(cipher: bytes) -> str:
+def decrypt_value(cipher) -> str:
+    # Accepts str (current TextField storage) or bytes/memoryview (rows
+    # written before the column was converted from BinaryField).
     if not cipher:
         return ""
+    if isinstance(cipher, memoryview):
+        cipher = bytes(cipher)
+    if isinstance(cipher, str):
+        cipher = cipher.encode("ascii")
     try:
         return _get_fernet().decrypt(cipher).decode()
     except InvalidToken:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import re
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple
 
 REQUIRED_KEYS = {
@@ -14,9 +15,23 @@ CANONICAL_STEPS = [
     "signed_off","ready_for_uat","deployed_uat","done"
 ]
 
+# Hoisted once at module load: the presence loop reuses one items() tuple
+# instead of rebuilding views on every validation call.
+REQUIRED_KEYS_ITEMS = tuple(REQUIRED_KEYS.items())
+
+@lru_cache(maxsize=512)
+def compile_pattern(pat: str) -> "re.Pattern[str]":
+    """
+    Compiled-regex cache keyed by pattern string. Shared with the normalizers
+    so config-supplied link patterns are compiled once per process instead of
+    per validation/match (re's own cache is small and evicts under churn).
+    Raises re.error for invalid patterns.
+    """
+    return re.compile(pat)
+
 def _compile_regex(pat: str) -> Tuple[bool, str]:
     try:
-        re.compile(pat)
+        compile_pattern(pat)
         return True, ""
     except re.error as e:
         return False, str(e)
@@ -38,7 +53,7 @@ def validate_mapping_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
     cfg = cfg or {}
 
     # ----- presence / shapes -----
-    for section, keys in REQUIRED_KEYS.items():
+    for section, keys in REQUIRED_KEYS_ITEMS:
         if section not in cfg:
             errors.append({"path": section, "msg": f"Missing '{section}' section"})
             continue
@@ -62,19 +77,24 @@ def validate_mapping_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
                 continue
             if not _nonempty_list(vals):
                 errors.append({"path": f"jira.status_map.{step}", "msg": "Must be a non-empty list of status names"})
-        # Detect duplicates across steps
-        seen = {}
-        for step, arr in status_map.items():
-            if not isinstance(arr, list): 
-                errors.append({"path": f"jira.status_map.{step}", "msg": "Must be a list"})
-                continue
-            for s in arr:
-                key = s.lower().strip()
+        # Detect duplicates across steps: normalize each status once up front,
+        # then a single O(total statuses) pass with no per-iteration casting.
+        normalized_map = {
+            step: [s.strip().casefold() if isinstance(s, str) else None for s in arr]
+            for step, arr in status_map.items()
+            if isinstance(arr, list)
+        }
+        for step in status_map.keys() - normalized_map.keys():
+            errors.append({"path": f"jira.status_map.{step}", "msg": "Must be a list"})
+        seen: Dict[str, str] = {}
+        for step, keys in normalized_map.items():
+            for s, key in zip(status_map[step], keys):
                 if not key:
                     errors.append({"path": f"jira.status_map.{step}", "msg": "Empty status string"})
                     continue
-                if key in seen and seen[key] != step:
-                    warnings.append({"path": f"jira.status_map", "msg": f"Status '{s}' appears in multiple steps: {seen[key]} and {step}"})
+                prev = seen.get(key)
+                if prev is not None and prev != step:
+                    warnings.append({"path": f"jira.status_map", "msg": f"Status '{s}' appears in multiple steps: {prev} and {step}"})
                 else:
                     seen[key] = step
 
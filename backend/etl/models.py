@@ -1,5 +1,6 @@
 from django.db import models
 import uuid
+from functools import cached_property, lru_cache
 from django.utils import timezone
 from .crypto import encrypt_value, decrypt_value
 
@@ -60,22 +61,45 @@ class ETLJobRun(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["job_name", "status"]),
-            models.Index(fields=["created_at"]),
+            # Composite indexes match the dashboard queries ("latest run per
+            # board", "failed runs for job X since T") so they become index
+            # range scans instead of index + filesort. created_at had its own
+            # index but started_at serves the same ordering.
+            models.Index(fields=["board", "-started_at"]),
+            models.Index(fields=["job_name", "status", "-started_at"]),
             models.Index(fields=["started_at"]),
         ]
         ordering = ["-started_at"]
 
+    def finalize(self, status: str, counters: dict = None, error_summary: dict = None):
+        """
+        Close the run with a single UPDATE: status, finished_at and any
+        accumulated counter deltas land in one round-trip instead of one
+        save() per increment.
+        """
+        now = timezone.now()
+        updates = {"status": status, "finished_at": now}
+        for field, delta in (counters or {}).items():
+            if delta:
+                updates[field] = models.F(field) + delta
+        if error_summary is not None:
+            updates["error_summary"] = error_summary
+        self.__class__.objects.filter(pk=self.pk).update(**updates)
+        # keep the in-memory instance consistent for callers/logging
+        self.status = status
+        self.finished_at = now
+        if error_summary is not None:
+            self.error_summary = error_summary
+
     def mark_success(self):
-        self.status = ETLStatus.SUCCESS
-        self.finished_at = timezone.now()
-        self.save(update_fields=["status", "finished_at"])
+        self.finalize(ETLStatus.SUCCESS, counters=getattr(self, "_pending_counters", None))
 
     def mark_failed(self, message: str = "", traceback_text: str = ""):
-        self.status = ETLStatus.FAILED
-        self.finished_at = timezone.now()
-        self.error_summary = {"message": message, "traceback": traceback_text}
-        self.save(update_fields=["status", "finished_at", "error_summary"])
+        self.finalize(
+            ETLStatus.FAILED,
+            counters=getattr(self, "_pending_counters", None),
+            error_summary={"message": message, "traceback": traceback_text},
+        )
 
     def duration_seconds(self) -> float:
         if not self.finished_at:
@@ -91,6 +115,16 @@ AUTH_TYPES = (
     ("oauth", "OAuth (token)"),
 )
 
+@lru_cache(maxsize=128)
+def _decrypt_token_cached(cred_id: int, updated_at_ts: float, token_encrypted: str) -> str:
+    """
+    Memoize Fernet decryption per credential so ETL spinning up one
+    connector per run doesn't re-decrypt the same ciphertext every time.
+    updated_at is part of the key, so a token rotation busts the cache.
+    """
+    return decrypt_value(token_encrypted)
+
+
 class BoardCredential(models.Model):
     """
     Secure per-board credential storage (encrypted tokens).
@@ -99,7 +133,9 @@ class BoardCredential(models.Model):
     api_base_url = models.CharField(max_length=512, help_text="https://your-instance.example.com")
     auth_type = models.CharField(max_length=16, choices=AUTH_TYPES, default="pat")
     username = models.CharField(max_length=255, null=True, blank=True)
-    token_encrypted = models.BinaryField(null=True, blank=True)
+    # Fernet tokens are URL-safe base64 text; TextField avoids the BYTEA
+    # escape + memoryview wrapping BinaryField pays on every fetch.
+    token_encrypted = models.TextField(null=True, blank=True)
     extra = models.JSONField(default=dict, blank=True)  # space for OAuth client_id/secret, scopes, etc.
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -110,11 +146,43 @@ class BoardCredential(models.Model):
         self.token_encrypted = encrypt_value(token)
 
     def get_token(self) -> str:
-        return decrypt_value(self.token_encrypted or b"")
+        updated_ts = self.updated_at.timestamp() if self.updated_at else 0.0
+        return _decrypt_token_cached(self.pk or 0, updated_ts, self.token_encrypted or "")
+
+    @cached_property
+    def token(self) -> str:
+        """Decrypted token, computed once per instance; invalidated on save."""
+        return self.get_token()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.__dict__.pop("token", None)
 
     def __str__(self):
         return f"Creds for {self.board}"
 
+class GitHubEtagCache(models.Model):
+    """
+    Conditional-request cache for the GitHub connector: last ETag /
+    Last-Modified seen per PR's reviews endpoint. Sending them back turns an
+    unchanged resource into a ~200-byte 304 that still costs only one
+    rate-limit unit and skips the body fetch entirely.
+    """
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="github_etags")
+    external_id = models.CharField(max_length=256)               # "<owner>/<repo>#<number>"
+    etag = models.CharField(max_length=128, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["board", "external_id"], name="uniq_github_etag_per_board"),
+        ]
+
+    def __str__(self):
+        return f"ETag {self.external_id} → {self.board}"
+
+
 NOTIFY_CHANNEL_TYPES = (
     ("teams", "Microsoft Teams"),
 )
@@ -128,8 +196,9 @@ class NotificationChannel(models.Model):
     name = models.CharField(max_length=255, help_text="Human label for this channel")
     is_active = models.BooleanField(default=True)
 
-    # Encrypted Teams webhook
-    webhook_encrypted = models.BinaryField(null=True, blank=True)
+    # Encrypted Teams webhook (Fernet token stored as text, like
+    # BoardCredential.token_encrypted)
+    webhook_encrypted = models.TextField(null=True, blank=True)
 
     # Filters/config
     rules = models.JSONField(default=list, blank=True)   # e.g., ["MISSING_POINTS","STUCK_IN_DEV"] or []
@@ -144,7 +213,7 @@ class NotificationChannel(models.Model):
         self.webhook_encrypted = encrypt_value(url)
 
     def get_webhook(self) -> str:
-        return decrypt_value(self.webhook_encrypted or b"")
+        return decrypt_value(self.webhook_encrypted or "")
 
     def __str__(self):
         return f"{self.name} ({self.channel_type}) → {self.board}"
\ No newline at end of file
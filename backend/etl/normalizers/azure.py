@@ -2,15 +2,23 @@ from __future__ import annotations
 from typing import Iterable, Dict, Any, Optional
 
 from metrics.models import WorkItem, Board, ItemType, Source, RawPayload
-from .base import to_dt, map_item_type, cfg
+from .base import to_dt, map_item_type, cfg, bulk_upsert_workitems, payload_hash, known_payload_hashes
 
 class AzureNormalizer:
+    SOURCE = Source.AZURE
+    RAW_OBJECT_TYPE = "work_item"
+
     def __init__(self, board: Board):
         self.board = board
         self.points_field = cfg(["azure","points_field"], "Microsoft.VSTS.Scheduling.StoryPoints")
 
     def normalize(self, raw_items: Iterable[RawPayload]) -> int:
-        count = 0
+        # Accumulate (source_id, defaults) rows and upsert once at the end;
+        # per-row update_or_create cost 2N round-trips on large backlogs.
+        rows = []
+        # Skip work items whose payload is byte-identical to what we last
+        # normalized — polling re-delivers mostly unchanged ones.
+        known_hashes = known_payload_hashes(Source.AZURE, self.board)
         for rp in raw_items:
             if rp.source != Source.AZURE or rp.object_type != "work_item":
                 continue
@@ -21,6 +29,10 @@ class AzureNormalizer:
             if not wid:
                 continue
 
+            h = payload_hash(wi)
+            if known_hashes.get(str(wid)) == h:
+                continue
+
             title = fields.get("System.Title") or "Untitled"
             itype = map_item_type(fields.get("System.WorkItemType"))
             status_name = fields.get("System.State") or ""
@@ -46,25 +58,20 @@ class AzureNormalizer:
 
             sprint_id = fields.get("System.IterationPath")  # path string; keep as id-like
 
-            WorkItem.objects.update_or_create(
-                source=Source.AZURE,
-                source_id=str(wid),
-                defaults=dict(
-                    board=self.board,
-                    title=title,
-                    item_type=itype,
-                    story_points=story_points,
-                    sprint_id=sprint_id,
-                    client_id=self.board.client_id,
-                    assignees=assignees,
-                    dev_owner=dev_owner,
-                    status=status_name or "backlog",
-                    created_at=created_at,
-                    started_at=created_at,  # no changelog here
-                    done_at=closed_at,
-                    closed=bool(closed_at),
-                    meta={"rev": wi.get("rev")},
-                )
-            )
-            count += 1
-        return count
+            rows.append((str(wid), dict(
+                board=self.board,
+                title=title,
+                item_type=itype,
+                story_points=story_points,
+                sprint_id=sprint_id,
+                client_id=self.board.client_id,
+                assignees=assignees,
+                dev_owner=dev_owner,
+                status=status_name or "backlog",
+                created_at=created_at,
+                started_at=created_at,  # no changelog here
+                done_at=closed_at,
+                closed=bool(closed_at),
+                meta={"rev": wi.get("rev"), "payload_hash": h},
+            )))
+        return bulk_upsert_workitems(Source.AZURE, rows)
@@ -1,17 +1,37 @@
 from __future__ import annotations
-import re, datetime as dt
+import hashlib, re, time, datetime as dt
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+import orjson
+
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
+from etl.mapping_validator import compile_pattern
 from etl.models import MappingVersion
 from metrics.models import WorkItem, PR, Board, ItemType, Source
 
 # -------------------- config helpers --------------------
 
+# The active mapping barely ever changes but cfg() is called from every
+# normalizer constructor and several per-item paths; a short per-process TTL
+# turns O(cfg calls) identical queries per run into at most one per minute.
+_MAPPING_CACHE_TTL = 60  # seconds
+_mapping_cache: Tuple[float, Optional[MappingVersion]] = (0.0, None)
+
 def active_mapping() -> Optional[MappingVersion]:
-    return MappingVersion.objects.filter(active=True).order_by("-created_at").first()
+    global _mapping_cache
+    ts, mv = _mapping_cache
+    now = time.monotonic()
+    if mv is None or now - ts > _MAPPING_CACHE_TTL:
+        mv = MappingVersion.objects.filter(active=True).order_by("-created_at").first()
+        _mapping_cache = (now, mv)
+    return mv
+
+def invalidate_mapping_cache():
+    """Drop the cached active mapping (e.g. at the start of a pipeline run)."""
+    global _mapping_cache
+    _mapping_cache = (0.0, None)
 
 def cfg(path: Sequence[str], default=None):
     mv = active_mapping()
@@ -32,26 +52,34 @@ def to_dt(val: Any) -> Optional[dt.datetime]:
         return None
     if isinstance(val, (int, float)):
         try:
-            # treat as milliseconds if big, else seconds
+            # treat as milliseconds if big, else seconds. fromtimestamp(tz=utc)
+            # is already aware; the old make_aware wrapper raised on it and
+            # silently turned every epoch value into None.
             if int(val) > 10_000_000_000:
-                return timezone.make_aware(dt.datetime.fromtimestamp(int(val)/1000.0, tz=dt.timezone.utc))
-            return timezone.make_aware(dt.datetime.fromtimestamp(int(val), tz=dt.timezone.utc))
+                return dt.datetime.fromtimestamp(int(val) / 1000.0, tz=dt.timezone.utc)
+            return dt.datetime.fromtimestamp(int(val), tz=dt.timezone.utc)
         except Exception:
             return None
     if isinstance(val, str):
         s = val.strip()
         # Jira like '2025-08-10T12:34:56.789+0000' -> '+00:00'
-        if re.search(r"[+-]\d{4}$", s):
-            s = s[:-5] + s[-5:-2] + ":" + s[-2:]
-        d = parse_datetime(s)
-        if d is None:
-            # try without millis
-            try:
-                d = dt.datetime.fromisoformat(s.replace("Z","+00:00"))
-            except Exception:
+        # (plain slice checks; this runs once per changelog timestamp, so no
+        # regex engine on the hot path)
+        if len(s) >= 5 and s[-5] in "+-" and s[-4:].isdigit():
+            s = s[:-2] + ":" + s[-2:]
+        elif s.endswith("Z"):
+            s = s[:-1] + "+00:00"
+        # fromisoformat is C and covers >99% of Jira/GitHub stamps; Django's
+        # regex-based parse_datetime only runs for the oddballs
+        try:
+            d = dt.datetime.fromisoformat(s)
+        except ValueError:
+            d = parse_datetime(s)
+            if d is None:
                 return None
-        if timezone.is_naive(d):
-            d = timezone.make_aware(d, timezone=dt.timezone.utc)
+        if d.tzinfo is None:
+            # plain tzinfo attach instead of timezone.make_aware (settings lookup)
+            d = d.replace(tzinfo=dt.timezone.utc)
         return d
     return None
 
@@ -84,13 +112,82 @@ def upsert_parent(board: Board, source: str, parent_key: Optional[str]) -> Optio
     )
     return parent
 
+# -------------------- payload dedupe --------------------
+
+def payload_hash(payload: Any) -> str:
+    """
+    Stable 128-bit content hash of a raw payload. blake2b via hashlib is
+    C-accelerated and orjson serializes with sorted keys so re-fetches of an
+    unchanged object hash identically regardless of key order.
+    """
+    return hashlib.blake2b(
+        orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+
+def known_payload_hashes(source: str, board: Board) -> Dict[str, Optional[str]]:
+    """
+    {source_id: meta['payload_hash']} for the board's existing items, fetched
+    in one query. Normalizers skip rows whose payload hash is unchanged —
+    steady-state polling re-ingests mostly unchanged objects, and skipping
+    them avoids rebuilding defaults and issuing no-op UPDATEs.
+    """
+    return {
+        sid: (meta or {}).get("payload_hash")
+        for sid, meta in WorkItem.objects.filter(
+            source=source, board=board
+        ).values_list("source_id", "meta")
+    }
+
+# -------------------- bulk upsert -----------------------
+
+def bulk_upsert_workitems(source: str, rows: List[Tuple[str, Dict[str, Any]]], batch_size: int = 1000, merge=None) -> int:
+    """
+    Upsert (source_id, defaults) pairs with O(N/batch) queries instead of a
+    SELECT + INSERT/UPDATE per row: one in_bulk fetch of the existing items,
+    then one bulk_update for the hits and one bulk_create for the misses.
+    Later duplicates of the same source_id win, matching update_or_create
+    called in order.
+
+    ``merge(sid, existing_or_None, defaults)`` lets callers adjust defaults
+    against the current row (e.g. carry-forward fields) without issuing their
+    own lookup — the in_bulk fetch here is the only read.
+    """
+    deduped = {str(sid): defaults for sid, defaults in rows}
+    if not deduped:
+        return 0
+    existing = WorkItem.objects.filter(
+        source=source, source_id__in=deduped
+    ).in_bulk(field_name="source_id")
+
+    to_update, to_create = [], []
+    update_fields: set = set()
+    for sid, defaults in deduped.items():
+        obj = existing.get(sid)
+        if merge is not None:
+            merge(sid, obj, defaults)
+        if obj is not None:
+            for field, value in defaults.items():
+                setattr(obj, field, value)
+            update_fields.update(defaults.keys())
+            to_update.append(obj)
+        else:
+            to_create.append(WorkItem(source=source, source_id=sid, **defaults))
+    if to_create:
+        WorkItem.objects.bulk_create(to_create, batch_size=batch_size)
+    if to_update:
+        WorkItem.objects.bulk_update(to_update, fields=sorted(update_fields), batch_size=batch_size)
+    return len(deduped)
+
 # -------------------- PR linking ------------------------
 
 JIRA_KEY_RE = re.compile(r"([A-Z]{2,}-\d+)")
 
-def extract_issue_keys_from_text(text: str, extra_patterns: Dict[str, str]) -> Dict[str, List[str]]:
+def extract_issue_keys_from_text(text: str, extra_patterns: Dict[str, Any]) -> Dict[str, List[str]]:
     """
     Returns {'jira': ['PROJ-123', ...], 'azure': ['1234'], ...}
+    extra_patterns values may be pre-compiled re.Pattern objects (preferred —
+    callers compile once per normalizer) or raw strings, which go through the
+    shared compile_pattern LRU instead of re-compiling per call.
     """
     found: Dict[str, List[str]] = {}
     if text:
@@ -100,27 +197,11 @@ def extract_issue_keys_from_text(text: str, extra_patterns: Dict[str, str]) -> D
             found.setdefault("jira", []).extend(sorted(set(jira_keys)))
         # extras from config
         for src, pat in (extra_patterns or {}).items():
-            try:
-                m = re.findall(pat, text)
-                if m: found.setdefault(src, []).extend(sorted(set([str(x) for x in m])))
-            except re.error:
-                continue
+            if isinstance(pat, str):
+                try:
+                    pat = compile_pattern(pat)
+                except re.error:
+                    continue
+            m = pat.findall(text)
+            if m: found.setdefault(src, []).extend(sorted(set([str(x) for x in m])))
     return found
-
-def add_linked_pr(work_item: WorkItem, pr_dict: Dict[str, Any], reviewers: List[str]):
-    """
-    Append PR link into WorkItem.linked_prs if not already present.
-    """
-    linked = work_item.linked_prs or []
-    pid = pr_dict.get("pr_id")
-    exists = any((x.get("pr_id") == pid) for x in linked)
-    if not exists:
-        linked.append({
-            "pr_id": pid,
-            "opened_at": pr_dict.get("opened_at"),
-            "first_reviewed_at": pr_dict.get("first_reviewed_at"),
-            "merged_at": pr_dict.get("merged_at"),
-            "reviewers": reviewers,
-        })
-        work_item.linked_prs = linked
-        work_item.save(update_fields=["linked_prs"])
@@ -2,18 +2,35 @@ from __future__ import annotations
 import re
 from typing import Iterable, Dict, Any, List
 
-from django.db import transaction
-
+from etl.mapping_validator import compile_pattern
 from metrics.models import WorkItem, PR, Board, Source, RawPayload
-from .base import to_dt, extract_issue_keys_from_text, cfg, add_linked_pr
+from .base import to_dt, extract_issue_keys_from_text, cfg
 
 class GitHubPRNormalizer:
+    SOURCE = Source.GITHUB
+    RAW_OBJECT_TYPE = "pr"
+
     def __init__(self, board: Board):
         self.board = board
         self.link_patterns = cfg(["github","link_patterns"], {"jira": r"([A-Z]{2,}-\d+)"}) or {}
+        # Compile the config-supplied patterns once per normalizer instead of
+        # per PR body; invalid patterns are dropped here rather than failing
+        # on every findall.
+        self.compiled_link_patterns: Dict[str, "re.Pattern[str]"] = {}
+        for src, pat in self.link_patterns.items():
+            try:
+                self.compiled_link_patterns[src] = compile_pattern(pat)
+            except re.error:
+                continue
 
     def normalize(self, raw_items: Iterable[RawPayload]) -> int:
+        # Pass 1: upsert PR rows and collect every extracted Jira key; the
+        # matching WorkItems are then fetched with one query and both sides
+        # of the link are written with one bulk_update each, instead of a
+        # lookup + two saves per PR × key.
         count = 0
+        pr_records: List[Dict[str, Any]] = []
+        all_jira_keys: set = set()
         for rp in raw_items:
             if rp.source != Source.GITHUB or rp.object_type != "pr":
                 continue
@@ -65,28 +82,57 @@ class GitHubPRNormalizer:
                 (pr.get("head") or {}).get("ref") or "",
                 (pr.get("base") or {}).get("ref") or "",
             ])
-            found = extract_issue_keys_from_text(text, self.link_patterns)
-
-            linked = 0
-            # Jira keys
-            for key in set(found.get("jira", [])):
-                wi = WorkItem.objects.filter(source=Source.JIRA, source_id=key).first()
-                if wi:
-                    pr_row.work_item = wi
-                    pr_row.save(update_fields=["work_item"])
-                    add_linked_pr(wi, {
-                        "pr_id": pr_id,
-                        "opened_at": opened_at.isoformat() if opened_at else None,
-                        "first_reviewed_at": first_reviewed_at.isoformat() if first_reviewed_at else None,
-                        "merged_at": merged_at.isoformat() if merged_at else None,
-                    }, reviewers)
-                    linked += 1
+            found = extract_issue_keys_from_text(text, self.compiled_link_patterns)
+            keys = set(found.get("jira", []))
+            all_jira_keys |= keys
+            pr_records.append({
+                "pr_row": pr_row,
+                "pr_id": pr_id,
+                "keys": keys,
+                "reviewers": reviewers,
+                "opened_at": opened_at,
+                "first_reviewed_at": first_reviewed_at,
+                "merged_at": merged_at,
+            })
 
             # (Optional) handle other sources if you add patterns:
-            # for src_name in ("azure","clickup"):
-            #   for sid in set(found.get(src_name, [])):
-            #       wi = WorkItem.objects.filter(source=src_name, source_id=str(sid)).first()
-            #       if wi: ... same as above
+            # collect found.get("azure")/found.get("clickup") keys here and
+            # extend the bulk fetch below with those sources.
+
+            count += 1
 
-            count += 1 if (linked or pr_row) else 0
+        # Pass 2: resolve links in bulk.
+        wi_map = {}
+        if all_jira_keys:
+            wi_map = {
+                wi.source_id: wi
+                for wi in WorkItem.objects.filter(source=Source.JIRA, source_id__in=all_jira_keys)
+            }
+        prs_to_update: Dict[int, PR] = {}
+        changed_wis: Dict[int, WorkItem] = {}
+        for rec in pr_records:
+            for key in rec["keys"]:
+                wi = wi_map.get(key)
+                if not wi:
+                    continue
+                pr_row = rec["pr_row"]
+                if pr_row.work_item_id != wi.id:
+                    pr_row.work_item = wi
+                    prs_to_update[pr_row.pk] = pr_row
+                # dedupe on pr_id in memory and flush once via bulk_update
+                linked = wi.linked_prs or []
+                if not any(x.get("pr_id") == rec["pr_id"] for x in linked):
+                    linked.append({
+                        "pr_id": rec["pr_id"],
+                        "opened_at": rec["opened_at"].isoformat() if rec["opened_at"] else None,
+                        "first_reviewed_at": rec["first_reviewed_at"].isoformat() if rec["first_reviewed_at"] else None,
+                        "merged_at": rec["merged_at"].isoformat() if rec["merged_at"] else None,
+                        "reviewers": rec["reviewers"],
+                    })
+                    wi.linked_prs = linked
+                    changed_wis[wi.id] = wi
+        if prs_to_update:
+            PR.objects.bulk_update(list(prs_to_update.values()), ["work_item"], batch_size=500)
+        if changed_wis:
+            WorkItem.objects.bulk_update(list(changed_wis.values()), ["linked_prs"], batch_size=500)
         return count
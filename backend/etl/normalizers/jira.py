@@ -1,36 +1,90 @@
 from __future__ import annotations
 from typing import Iterable, Dict, Any, List
 
-from django.db import transaction
 from django.utils import timezone
 
 from metrics.models import WorkItem, Board, ItemType, Source, RawPayload
-from .base import to_dt, earliest, map_item_type, contains_blocked, upsert_parent, cfg
+from .base import to_dt, map_item_type, contains_blocked, cfg, bulk_upsert_workitems, payload_hash, known_payload_hashes
 
 class JiraNormalizer:
+    SOURCE = Source.JIRA
+    RAW_OBJECT_TYPE = "issue"
+
     def __init__(self, board: Board):
         self.board = board
         self.points_field = cfg(["jira","points_field"], "customfield_10016")
         self.status_map = cfg(["jira","status_map"], {}) or {}
-
-    def _status_time(self, issue: Dict[str,Any], targets: List[str]):
+        # Lowercase the target names once per normalizer; the per-issue lookup
+        # only needs set membership against the lowercased status index.
+        self._status_targets: Dict[str, set] = {
+            phase: {t.lower() for t in (names or [])}
+            for phase, names in self.status_map.items()
+        }
+
+    def _build_status_index(self, issue: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Find first time status moved into any of the target names using changelog.
+        One pass over changelog.histories: earliest time the issue moved into
+        each status, keyed by lowercased status name. Replaces nine full
+        changelog walks (each re-parsing every 'created' stamp) per issue.
         """
-        targets_lower = {t.lower() for t in targets or []}
+        idx: Dict[str, Any] = {}
         histories = ((issue or {}).get("changelog") or {}).get("histories", []) or []
-        hits = []
         for h in histories:
             when = to_dt(h.get("created"))
+            if not when:
+                continue
             for item in h.get("items", []) or []:
                 if item.get("field") == "status":
                     to_name = (item.get("toString") or "").lower()
-                    if to_name in targets_lower and when:
-                        hits.append(when)
-        return earliest(hits)
+                    prev = idx.get(to_name)
+                    if prev is None or when < prev:
+                        idx[to_name] = when
+        return idx
+
+    def _resolve_parents(self, parent_keys: set) -> Dict[str, WorkItem]:
+        """
+        get_or_create for every parent epic in at most three queries: one
+        SELECT for the existing rows, one bulk_create(ignore_conflicts=True)
+        for the misses, one SELECT to pick up what was just (or concurrently)
+        created. Replaces a get_or_create round trip per issue.
+        """
+        if not parent_keys:
+            return {}
+        existing = WorkItem.objects.filter(
+            source=Source.JIRA, source_id__in=parent_keys
+        ).in_bulk(field_name="source_id")
+        missing = [k for k in parent_keys if k not in existing]
+        if missing:
+            WorkItem.objects.bulk_create(
+                [
+                    WorkItem(
+                        source=Source.JIRA, source_id=k, board=self.board,
+                        title=f"Parent {k}", item_type=ItemType.STORY,
+                    )
+                    for k in missing
+                ],
+                ignore_conflicts=True,
+            )
+            existing.update(
+                WorkItem.objects.filter(
+                    source=Source.JIRA, source_id__in=missing
+                ).in_bulk(field_name="source_id")
+            )
+        return existing
+
+    def _phase_time(self, idx: Dict[str, Any], phase: str):
+        """Earliest time the issue entered any of the phase's target statuses."""
+        targets = self._status_targets.get(phase) or ()
+        return min((idx[t] for t in targets if t in idx), default=None)
 
     def normalize(self, raw_items: Iterable[RawPayload]) -> int:
-        count = 0
+        # Accumulate (source_id, defaults) rows and upsert once at the end;
+        # per-row update_or_create cost 2N round-trips on large backlogs.
+        rows: List = []
+        # Skip issues whose payload is byte-identical to what we last
+        # normalized — steady-state polling re-delivers mostly unchanged ones.
+        known_hashes = known_payload_hashes(Source.JIRA, self.board)
+        parent_keys: set = set()
         # Only issues for this board/source
         for rp in raw_items:
             if rp.source != Source.JIRA or rp.object_type != "issue":
@@ -39,7 +93,11 @@ class JiraNormalizer:
             fields = issue.get("fields") or {}
 
             key = issue.get("key") or issue.get("id")
-            if not key: 
+            if not key:
+                continue
+
+            h = payload_hash(issue)
+            if known_hashes.get(str(key)) == h:
                 continue
 
             title = fields.get("summary") or "Untitled"
@@ -74,21 +132,24 @@ class JiraNormalizer:
             updated_at = to_dt(fields.get("updated"))
             resolutiondate = to_dt(fields.get("resolutiondate"))
 
-            # status-based timestamps via changelog
-            dev_started_at = self._status_time(issue, self.status_map.get("dev_started", []))
-            dev_done_at = self._status_time(issue, self.status_map.get("dev_done", []))
-            ready_for_qa_at = self._status_time(issue, self.status_map.get("ready_for_qa", []))
-            qa_started_at = self._status_time(issue, self.status_map.get("qa_started", []))
-            qa_verified_at = self._status_time(issue, self.status_map.get("qa_verified", []))
-            signed_off_at = self._status_time(issue, self.status_map.get("signed_off", []))
-            ready_for_uat_at = self._status_time(issue, self.status_map.get("ready_for_uat", []))
-            deployed_uat_at = self._status_time(issue, self.status_map.get("deployed_uat", []))
-            done_at = resolutiondate or self._status_time(issue, self.status_map.get("done", []))
+            # status-based timestamps via a single changelog pass
+            status_idx = self._build_status_index(issue)
+            dev_started_at = self._phase_time(status_idx, "dev_started")
+            dev_done_at = self._phase_time(status_idx, "dev_done")
+            ready_for_qa_at = self._phase_time(status_idx, "ready_for_qa")
+            qa_started_at = self._phase_time(status_idx, "qa_started")
+            qa_verified_at = self._phase_time(status_idx, "qa_verified")
+            signed_off_at = self._phase_time(status_idx, "signed_off")
+            ready_for_uat_at = self._phase_time(status_idx, "ready_for_uat")
+            deployed_uat_at = self._phase_time(status_idx, "deployed_uat")
+            done_at = resolutiondate or self._phase_time(status_idx, "done")
 
             blocked_flag = contains_blocked(status_name, labels)
 
+            # hold the raw key; resolved in bulk after the loop
             parent_key = ((fields.get("parent") or {}).get("key"))
-            parent_story = upsert_parent(self.board, Source.JIRA, parent_key)
+            if parent_key:
+                parent_keys.add(str(parent_key))
 
             defaults = dict(
                 board=self.board,
@@ -114,32 +175,35 @@ class JiraNormalizer:
                 deployed_uat_at=deployed_uat_at,
                 done_at=done_at,
                 blocked_flag=blocked_flag,
-                parent_story=parent_story,
-                meta={"project": (fields.get("project") or {}).get("key")},
+                parent_story=str(parent_key) if parent_key else None,
+                meta={"project": (fields.get("project") or {}).get("key"), "payload_hash": h},
                 closed=bool(done_at),
             )
-            
-            with transaction.atomic():
-                existing = WorkItem.objects.filter(source=Source.JIRA, source_id=str(key)).select_for_update().first()
-
-                # Carry forward / set blocked_since
-                if existing:
-                    # if newly blocked
-                    if blocked_flag and not existing.blocked_flag:
-                        defaults["blocked_since"] = timezone.now()
-                    # if still blocked, keep original
-                    elif blocked_flag and existing.blocked_flag:
-                        defaults["blocked_since"] = existing.blocked_since or timezone.now()
-                    # if unblocked now
-                    elif not blocked_flag:
-                        defaults["blocked_since"] = None
+            rows.append((str(key), defaults))
+
+        if not rows:
+            return 0
+
+        # Swap raw parent keys for resolved WorkItems (bulk get_or_create)
+        parents = self._resolve_parents(parent_keys)
+        for _sid, defaults in rows:
+            pk = defaults["parent_story"]
+            defaults["parent_story"] = parents.get(pk) if pk else None
+
+        # Carry forward / set blocked_since against the pre-existing state via
+        # the upsert's own prefetched map — no extra read of our own.
+        now = timezone.now()
+
+        def _carry_blocked(sid, existing, defaults):
+            blocked_flag = defaults["blocked_flag"]
+            if existing is not None:
+                if blocked_flag and not existing.blocked_flag:
+                    defaults["blocked_since"] = now              # newly blocked
+                elif blocked_flag and existing.blocked_flag:
+                    defaults["blocked_since"] = existing.blocked_since or now  # still blocked, keep original
                 else:
-                    defaults["blocked_since"] = timezone.now() if blocked_flag else None
+                    defaults["blocked_since"] = None             # unblocked now
+            else:
+                defaults["blocked_since"] = now if blocked_flag else None
 
-            WorkItem.objects.update_or_create(
-                source=Source.JIRA,
-                source_id=str(key),
-                defaults=defaults
-            )
-            count += 1
-        return count
+        return bulk_upsert_workitems(Source.JIRA, rows, merge=_carry_blocked)
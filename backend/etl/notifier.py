@@ -1,6 +1,9 @@
 from __future__ import annotations
 import datetime as dt
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count
 from django.utils import timezone
 from django.conf import settings
 from celery import shared_task
@@ -23,30 +26,37 @@ def _collect_for_board(board: Board, channel: NotificationChannel, window_minute
     now = timezone.now()
     since = now - dt.timedelta(minutes=window_minutes)
 
-    open_qs = RemediationTicket.objects.filter(board=board).exclude(status=RemediationStatus.DONE)
+    # select_related avoids a SELECT per ticket for rt.work_item.source_id;
+    # only() keeps the row to the columns this summary actually reads.
+    open_qs = (
+        RemediationTicket.objects.filter(board=board)
+        .exclude(status=RemediationStatus.DONE)
+        .select_related("work_item")
+        .only("rule_code", "status", "created_at", "updated_at", "work_item__source_id")
+    )
 
-    # Recently created/updated or never notified
+    # Recently created/updated or never notified — grouped, counted and
+    # sampled in Postgres; Python only filters the small per-rule result
     recent = open_qs.filter(created_at__gte=since) | open_qs.filter(updated_at__gte=since)
-    recent = recent.order_by("-created_at")
 
     grouped: Dict[str, Dict[str, Any]] = {}
-    for rt in recent:
-        if not _should_include(rt.rule_code, channel): continue
-        g = grouped.setdefault(rt.rule_code, {"rule": rt.rule_code, "count": 0, "samples": []})
-        g["count"] += 1
-        # sample string
-        tag = f"{(rt.work_item.source_id if rt.work_item else 'n/a')}"
-        if tag not in g["samples"]:
-            g["samples"].append(tag)
-
-    # If nothing recent, include a small summary of still-open tickets (top rules)
+    agg = recent.order_by().values("rule_code").annotate(
+        cnt=Count("id"),
+        sample_ids=ArrayAgg("work_item__source_id", distinct=True),
+    )
+    for row in agg:
+        if not _should_include(row["rule_code"], channel): continue
+        samples = [str(s) for s in (row["sample_ids"] or []) if s]
+        grouped[row["rule_code"]] = {"rule": row["rule_code"], "count": row["cnt"], "samples": samples}
+
+    # If nothing recent, include a small summary of still-open tickets (top
+    # rules) — counted and sorted in Postgres instead of fetching every row
     if not grouped:
-        counts: Dict[str,int] = {}
-        for rt in open_qs:
-            if not _should_include(rt.rule_code, channel): continue
-            counts[rt.rule_code] = counts.get(rt.rule_code, 0) + 1
-        for rule, cnt in sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:5]:
-            grouped[rule] = {"rule": rule, "count": cnt, "samples": []}
+        agg = open_qs.values("rule_code").annotate(c=Count("id")).order_by("-c")
+        for row in agg:
+            if not _should_include(row["rule_code"], channel): continue
+            grouped[row["rule_code"]] = {"rule": row["rule_code"], "count": row["c"], "samples": []}
+            if len(grouped) >= 5: break
 
     return grouped
 
@@ -57,7 +67,10 @@ def notify_remediation_tickets(board_id: int | None = None, window_minutes: int
     Marks tickets as 'last_notified_at' in meta to reduce noise (best effort).
     """
     boards = Board.objects.filter(id=board_id) if board_id else Board.objects.all()
-    sent = 0
+    # (url, payload) pairs collected across boards and POSTed concurrently at
+    # the end — each webhook call blocks 100-500ms, so posting serially
+    # stalls the worker for dozens of boards
+    posts: List[Tuple[str, Dict[str, Any]]] = []
 
     for board in boards:
         channels = NotificationChannel.objects.filter(board=board, is_active=True, channel_type="teams")
@@ -75,15 +88,24 @@ def notify_remediation_tickets(board_id: int | None = None, window_minutes: int
         for ch in channels:
             url = ch.get_webhook()
             if not url: continue
-            ok = post_teams_card(url, payload)
-            if ok: sent += 1
+            posts.append((url, payload))
 
-        # mark meta.last_notified_at on the recent tickets
+        # mark meta.last_notified_at on the recent tickets — mutate in memory
+        # and flush with one bulk_update instead of an UPDATE per ticket
         now = timezone.now()
+        now_iso = now.isoformat()
         recent_qs = RemediationTicket.objects.filter(board=board).exclude(status=RemediationStatus.DONE).filter(updated_at__gte=now - dt.timedelta(minutes=window_minutes))
-        for rt in recent_qs:
+        tickets_to_mark = list(recent_qs.only("id", "meta"))
+        for rt in tickets_to_mark:
             meta = rt.meta or {}
-            meta["last_notified_at"] = now.isoformat()
+            meta["last_notified_at"] = now_iso
             rt.meta = meta
-            rt.save(update_fields=["meta"])
-    return sent
+        if tickets_to_mark:
+            RemediationTicket.objects.bulk_update(tickets_to_mark, ["meta"], batch_size=500)
+
+    if not posts:
+        return 0
+    # network-bound; requests releases the GIL while waiting on the webhook
+    with ThreadPoolExecutor(max_workers=min(16, len(posts))) as ex:
+        results = list(ex.map(lambda up: post_teams_card(*up), posts))
+    return sum(1 for ok in results if ok)
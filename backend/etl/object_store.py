@@ -1,10 +1,17 @@
-import io, json, gzip, datetime as dt
+import io, gzip, datetime as dt
+from functools import lru_cache
 from typing import Optional, Tuple
 import boto3
+import orjson
 from botocore.client import Config
 from django.conf import settings
 
+@lru_cache(maxsize=1)
 def _client():
+    # Memoized: endpoint resolution, credential-chain walk and the TLS
+    # handshake happen once per process; the botocore connection pool then
+    # persists across every put/get in an offload loop. boto3 clients are
+    # thread-safe for these operations.
     use_ssl = bool(int(str(getattr(settings, "S3_USE_SSL", "0"))))
     endpoint = getattr(settings, "S3_ENDPOINT", None)
     return boto3.client(
@@ -12,7 +19,12 @@ def _client():
         endpoint_url=endpoint,
         aws_access_key_id=getattr(settings, "S3_ACCESS_KEY", None),
         aws_secret_access_key=getattr(settings, "S3_SECRET_KEY", None),
-        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        config=Config(
+            signature_version="s3v4",
+            s3={"addressing_style": "path"},
+            max_pool_connections=50,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
         use_ssl=use_ssl,
         verify=use_ssl,
     )
@@ -36,21 +48,76 @@ def build_key(prefix: str, *, source: str, board_id: str, object_type: str, exte
     safe_ext = (external_id or "unknown").replace("/", "_")
     return f"{prefix}/{source}/{safe_bid}/{object_type}/{yyyy}/{mm}/{dd}/{safe_ext}_{stamp}.json.gz"
 
+# Raw JSON bodies above this are stream-compressed through upload_fileobj so
+# the uncompressed bytes and a full gzipped copy never coexist in memory.
+_MULTIPART_THRESHOLD = 1 << 20  # 1 MiB
+
+class _GzipCompressReader:
+    """
+    Read-side gzip for upload_fileobj: compresses `data` in 64 KiB slices as
+    the uploader pulls, so at most one compressed chunk is buffered at a time
+    instead of the whole blob. bytes_out holds the compressed size once the
+    stream is drained.
+    """
+    _CHUNK = 64 * 1024
+
+    def __init__(self, data: bytes, level: int):
+        self._data = memoryview(data)
+        self._pos = 0
+        self._out = bytearray()
+        self._buf = io.BytesIO()
+        self._gz = gzip.GzipFile(fileobj=self._buf, mode="wb", compresslevel=level)
+        self._done = False
+        self.bytes_out = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._done and (size < 0 or len(self._out) < size):
+            if self._pos < len(self._data):
+                self._gz.write(self._data[self._pos:self._pos + self._CHUNK])
+                self._pos += self._CHUNK
+            else:
+                self._gz.close()
+                self._done = True
+            self._out += self._buf.getvalue()
+            self._buf.seek(0)
+            self._buf.truncate(0)
+        if size < 0 or size >= len(self._out):
+            chunk, self._out = bytes(self._out), bytearray()
+        else:
+            chunk, self._out = bytes(self._out[:size]), self._out[size:]
+        self.bytes_out += len(chunk)
+        return chunk
+
 def put_json_gz(bucket: str, key: str, obj) -> int:
-    """Return bytes written."""
-    data = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
-    out = io.BytesIO()
-    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz:
-        gz.write(data)
-    body = out.getvalue()
-    _client().put_object(Bucket=bucket, Key=key, Body=body, ContentType="application/json", ContentEncoding="gzip")
-    return len(body)
+    """Return bytes written (compressed size)."""
+    # orjson serializes straight to UTF-8 bytes; gzip level 1 is 3-5x cheaper
+    # than the default 6 with near-identical ratio on JSON, which matters when
+    # offloading thousands of small payloads per run.
+    level = int(getattr(settings, "S3_GZIP_LEVEL", 1))
+    raw = orjson.dumps(obj)
+    if len(raw) <= _MULTIPART_THRESHOLD:
+        body = gzip.compress(raw, compresslevel=level)
+        _client().put_object(Bucket=bucket, Key=key, Body=body, ContentType="application/json", ContentEncoding="gzip")
+        return len(body)
+    stream = _GzipCompressReader(raw, level)
+    _client().upload_fileobj(
+        stream, bucket, key,
+        ExtraArgs={"ContentType": "application/json", "ContentEncoding": "gzip"},
+    )
+    return stream.bytes_out
 
 def get_json_gz(bucket: str, key: str):
     resp = _client().get_object(Bucket=bucket, Key=key)
     raw = resp["Body"].read()
     with gzip.GzipFile(fileobj=io.BytesIO(raw), mode="rb") as gz:
-        return json.loads(gz.read().decode("utf-8"))
+        return orjson.loads(gz.read())
 
 def delete_object(bucket: str, key: str):
     _client().delete_object(Bucket=bucket, Key=key)
+
+def delete_objects(bucket: str, keys):
+    """Batch delete up to 1000 keys (the S3 API limit) in one request."""
+    _client().delete_objects(
+        Bucket=bucket,
+        Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True},
+    )
@@ -30,8 +30,9 @@ def etl_pipeline(board_id: int, stages: list[str], mapping_version: str = "v1",
     Enqueue the chosen stages as a Celery chain and return summary with the root task id.
     Note: the returned dict is available when the pipeline completes; callers usually use AsyncResult to poll.
     """
-    # sanity
-    Board.objects.get(pk=board_id)  # will raise DoesNotExist if invalid
+    # sanity — EXISTS on the pk index instead of materializing the full row
+    if not Board.objects.filter(pk=board_id).exists():
+        raise Board.DoesNotExist(f"Board {board_id} does not exist")
     flow = _build_chain(board_id, stages, mapping_version, date_iso)
     res = flow.apply_async()
     return {"root_task_id": res.id, "board_id": board_id, "stages": stages, "mapping_version": mapping_version, "date_iso": date_iso}
@@ -9,22 +9,28 @@ from .normalizers.clickup import ClickUpNormalizer
 from .normalizers.azure import AzureNormalizer
 from .normalizers.github import GitHubPRNormalizer
 
+# dispatch tables instead of if-ladders; adding a source is one entry here
+_CONNECTORS = {
+    Source.JIRA: JiraConnector,
+    Source.CLICKUP: ClickUpConnector,
+    Source.AZURE: AzureConnector,
+}
+
+_NORMALIZERS = {
+    Source.JIRA: JiraNormalizer,
+    Source.CLICKUP: ClickUpNormalizer,
+    Source.AZURE: AzureNormalizer,
+    Source.GITHUB: GitHubPRNormalizer,
+}
+
 def get_connector(board: Board):
-    if board.source == Source.JIRA:
-        return JiraConnector(board)
-    if board.source == Source.CLICKUP:
-        return ClickUpConnector(board)
-    if board.source == Source.AZURE:
-        return AzureConnector(board)
-    raise NotImplementedError(f"No connector implemented for source={board.source}")
+    cls = _CONNECTORS.get(board.source)
+    if cls is None:
+        raise NotImplementedError(f"No connector implemented for source={board.source}")
+    return cls(board)
 
 def get_normalizer(board: Board):
-    if board.source == Source.JIRA:
-        return JiraNormalizer(board)
-    if board.source == Source.CLICKUP:
-        return ClickUpNormalizer(board)
-    if board.source == Source.AZURE:
-        return AzureNormalizer(board)
-    if board.source == Source.GITHUB:
-        return GitHubPRNormalizer(board)
-    raise NotImplementedError(f"No normalizer implemented for source={board.source}")
\ No newline at end of file
+    cls = _NORMALIZERS.get(board.source)
+    if cls is None:
+        raise NotImplementedError(f"No normalizer implemented for source={board.source}")
+    return cls(board)
\ No newline at end of file
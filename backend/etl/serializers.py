@@ -27,19 +27,24 @@ class BoardCredentialSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         token = validated_data.pop("token_plain", "")
-        cred = BoardCredential.objects.create(**validated_data)
+        cred = BoardCredential(**validated_data)
         if token:
             cred.set_token(token)
-            cred.save(update_fields=["token_encrypted"])
+        cred.save()  # single INSERT, token_encrypted included
         return cred
 
     def update(self, instance, validated_data):
         token = validated_data.pop("token_plain", "")
+        changed = set()
         for k, v in validated_data.items():
             setattr(instance, k, v)
+            changed.add(k)
         if token:
             instance.set_token(token)
-        instance.save()
+            changed.add("token_encrypted")
+        if changed:
+            changed.add("updated_at")  # auto_now only writes listed fields
+            instance.save(update_fields=list(changed))
         return instance
 
 
@@ -57,13 +62,19 @@ class NotificationChannelSerializer(serializers.ModelSerializer):
 
     def create(self, validated):
         w = validated.pop("webhook_plain", "")
-        inst = NotificationChannel.objects.create(**validated)
-        if w: inst.set_webhook(w); inst.save(update_fields=["webhook_encrypted"])
+        inst = NotificationChannel(**validated)
+        if w: inst.set_webhook(w)
+        inst.save()  # single INSERT, webhook_encrypted included
         return inst
 
     def update(self, inst, validated):
         w = validated.pop("webhook_plain", "")
-        for k,v in validated.items(): setattr(inst, k, v)
-        if w: inst.set_webhook(w)
-        inst.save()
+        changed = set()
+        for k,v in validated.items():
+            setattr(inst, k, v); changed.add(k)
+        if w:
+            inst.set_webhook(w); changed.add("webhook_encrypted")
+        if changed:
+            changed.add("updated_at")  # auto_now only writes listed fields
+            inst.save(update_fields=list(changed))
         return inst
\ No newline at end of file
@@ -1,13 +1,17 @@
 from __future__ import annotations
 from rest_framework import serializers
 
+# frozen once at import; shared by every serializer instantiation instead of
+# rebuilding the choices list per request
+_STAGES: tuple = ("fetch", "normalize", "validate", "snapshot")
+
 class RunETLSerializer(serializers.Serializer):
     board_id = serializers.IntegerField()
     stages = serializers.ListField(
-        child=serializers.ChoiceField(choices=["fetch","normalize","validate","snapshot"]),
+        child=serializers.ChoiceField(choices=_STAGES),
         required=False,
         allow_empty=True,
-        default=["fetch","normalize","validate","snapshot"]
+        default=lambda: list(_STAGES)
     )
     mapping_version = serializers.CharField(required=False, allow_blank=True, default="v1")
     date_for_snapshot = serializers.DateField(required=False)  # optional, only used if 'snapshot' in stages
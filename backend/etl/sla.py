@@ -5,53 +5,68 @@ from typing import Dict, Any, Optional, Tuple
 from django.utils import timezone
 from celery import shared_task
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 
 from etl.models import MappingVersion
 from metrics.models import WorkItem, Board, RemediationTicket, RemediationStatus
-from etl.validator import open_ticket, resolve_ticket_if_any  # reuse helpers
 
 def _cfg() -> Dict[str, Any]:
     mv = MappingVersion.objects.filter(active=True).order_by("-created_at").first()
     root = mv.config if mv else {}
     return (root.get("sla") or {}) if isinstance(root, dict) else {}
 
-def _hours_for_item(wi: WorkItem) -> int:
-    cfg = _cfg()
-    defaults = getattr(settings, "SLA_DEFAULTS", {}) or {}
+class _SlaCfgCache:
+    """
+    SLA config parsed once per task run: one MappingVersion query and one
+    lowercasing pass, instead of a fresh query plus rebuilt dict
+    comprehensions for every work item.
+    """
+    __slots__ = ("pri_map_lower", "pri_keys_lower", "type_map_lower", "default_hours")
+
+    def __init__(self):
+        cfg = _cfg()
+        defaults = getattr(settings, "SLA_DEFAULTS", {}) or {}
+        pri_map = (cfg.get("by_priority") or {}) or (defaults.get("by_priority") or {})
+        type_map = (cfg.get("by_type") or {}) or (defaults.get("by_type") or {})
+        self.pri_map_lower: Dict[str, int] = {}
+        for k, v in pri_map.items():
+            try: self.pri_map_lower[str(k).lower()] = int(v)
+            except Exception: pass
+        self.pri_keys_lower = frozenset(self.pri_map_lower)
+        self.type_map_lower: Dict[str, int] = {}
+        for k, v in type_map.items():
+            try: self.type_map_lower[str(k).lower()] = int(v)
+            except Exception: pass
+        try:
+            self.default_hours = int(cfg.get("blocked_hours", defaults.get("blocked_hours", 48)))
+        except Exception:
+            self.default_hours = 48
+
+def _hours_for_item(wi: WorkItem, cache: _SlaCfgCache) -> int:
     # priority-based override (by label or status/priority field in meta)
-    pri_map = (cfg.get("by_priority") or {}) or (defaults.get("by_priority") or {})
     priority = None
-    # try from meta or labels in meta
     if isinstance(wi.meta, dict):
         priority = (wi.meta.get("priority") or wi.meta.get("Priority") or "").strip()
         if not priority:
             labels = wi.meta.get("labels") or []
             if isinstance(labels, list):
                 for l in labels:
-                    if str(l).lower() in {k.lower() for k in pri_map.keys()}:
+                    if str(l).lower() in cache.pri_keys_lower:
                         priority = str(l)
                         break
     if priority:
-        for k, v in pri_map.items():
-            if priority.lower() == str(k).lower():
-                try: return int(v)
-                except: pass
+        h = cache.pri_map_lower.get(priority.lower())
+        if h is not None:
+            return h
 
     # type-based override
-    type_map = (cfg.get("by_type") or {}) or (defaults.get("by_type") or {})
-    t = (wi.item_type or "").lower()
-    if t in {k.lower(): v for k, v in type_map.items()}:
-        try:
-            return int({k.lower(): v for k, v in type_map.items()}[t])
-        except:
-            pass
+    h = cache.type_map_lower.get((wi.item_type or "").lower())
+    if h is not None:
+        return h
 
     # global fallback
-    try:
-        return int(cfg.get("blocked_hours", defaults.get("blocked_hours", 48)))
-    except:
-        return 48
+    return cache.default_hours
 
 @shared_task(queue="default")
 def sla_check_blocked(board_id: Optional[int] = None, lookback_days: int = 30) -> int:
@@ -61,34 +76,95 @@ def sla_check_blocked(board_id: Optional[int] = None, lookback_days: int = 30) -
     """
     boards = Board.objects.filter(id=board_id) if board_id else Board.objects.all()
     touched = 0
+    cfg_cache = _SlaCfgCache()
 
     for b in boards:
         # Only consider items with blocked_flag true and blocked_since known; small lookback bound for perf
         since = timezone.now() - dt.timedelta(days=lookback_days)
         items = (WorkItem.objects
                  .filter(board=b, blocked_flag=True)
-                 .filter(Q(blocked_since__isnull=False) | Q(updated_at__gte=since)))  # tolerate missing blocked_since
+                 .filter(Q(blocked_since__isnull=False) | Q(updated_at__gte=since))  # tolerate missing blocked_since
+                 .only("id", "closed", "blocked_since", "dev_started_at", "created_at",
+                       "source_id", "item_type", "meta"))
 
-        for wi in items:
-            # skip closed
-            if wi.closed:
-                resolve_ticket_if_any(b, wi, "BLOCKED_SLA")
-                continue
+        # Stream rows (server-side cursor) and collect ticket intents; the
+        # open_ticket/resolve_ticket_if_any helpers issue per-row queries,
+        # so batched equivalents run after the loop instead.
+        now = timezone.now()
+        violations = []          # (work_item, message, meta)
+        resolve_ids: list = []   # work item ids whose BLOCKED_SLA ticket should close
+
+        if not cfg_cache.pri_map_lower and not cfg_cache.type_map_lower:
+            # uniform SLA (no priority/type overrides): compare server-side
+            # so only violating rows — plus the ids to resolve — leave the DB
+            limit_h = cfg_cache.default_hours
+            threshold = now - dt.timedelta(hours=limit_h)
+            annotated = items.annotate(
+                sla_start=Coalesce("blocked_since", "dev_started_at", "created_at"))
+            resolve_ids = list(
+                annotated.filter(Q(closed=True) | Q(sla_start__isnull=True) | Q(sla_start__gte=threshold))
+                .values_list("id", flat=True))
+            for wi in annotated.filter(
+                    closed=False, sla_start__isnull=False, sla_start__lt=threshold
+            ).iterator(chunk_size=2000):
+                hours = (now - wi.sla_start).total_seconds() / 3600.0
+                msg = f"Blocked for ~{int(hours)}h, SLA {limit_h}h exceeded (item {wi.source_id})."
+                violations.append((wi, msg, {"blocked_since": wi.sla_start.isoformat(), "sla_hours": limit_h}))
+        else:
+            for wi in items.iterator(chunk_size=2000):
+                if wi.closed:
+                    resolve_ids.append(wi.id)
+                    continue
 
-            start = wi.blocked_since or wi.dev_started_at or wi.created_at
-            if not start:
-                resolve_ticket_if_any(b, wi, "BLOCKED_SLA")
-                continue
+                start = wi.blocked_since or wi.dev_started_at or wi.created_at
+                if not start:
+                    resolve_ids.append(wi.id)
+                    continue
 
-            hours = (timezone.now() - start).total_seconds() / 3600.0
-            limit_h = _hours_for_item(wi)
+                hours = (now - start).total_seconds() / 3600.0
+                limit_h = _hours_for_item(wi, cfg_cache)
 
-            if hours > limit_h:
-                msg = f"Blocked for ~{int(hours)}h, SLA {limit_h}h exceeded (item {wi.source_id})."
-                open_ticket(b, wi, "BLOCKED_SLA", msg, meta={"blocked_since": start.isoformat(), "sla_hours": limit_h})
-                touched += 1
-            else:
-                resolve_ticket_if_any(b, wi, "BLOCKED_SLA")
+                if hours > limit_h:
+                    msg = f"Blocked for ~{int(hours)}h, SLA {limit_h}h exceeded (item {wi.source_id})."
+                    violations.append((wi, msg, {"blocked_since": start.isoformat(), "sla_hours": limit_h}))
+                else:
+                    resolve_ids.append(wi.id)
+
+        if resolve_ids:
+            (RemediationTicket.objects
+             .filter(board=b, rule_code="BLOCKED_SLA", work_item_id__in=resolve_ids)
+             .exclude(status=RemediationStatus.DONE)
+             .update(status=RemediationStatus.DONE, resolved_at=now, updated_at=now))
+
+        if violations:
+            # idempotent like open_ticket: refresh the still-open ticket if
+            # one exists, create otherwise — one SELECT + one bulk_update +
+            # one bulk_create for the whole board
+            existing = {
+                rt.work_item_id: rt
+                for rt in RemediationTicket.objects
+                    .filter(board=b, rule_code="BLOCKED_SLA",
+                            work_item_id__in=[wi.id for wi, _, _ in violations])
+                    .exclude(status=RemediationStatus.DONE)
+                    .order_by("created_at")
+            }
+            to_update, to_create = [], []
+            for wi, msg, meta in violations:
+                rt = existing.get(wi.id)
+                if rt is not None:
+                    if rt.message != msg or (rt.meta or {}) != meta:
+                        rt.message = msg
+                        rt.meta = meta
+                        rt.updated_at = now  # bulk_update skips auto_now
+                        to_update.append(rt)
+                else:
+                    to_create.append(RemediationTicket(
+                        board=b, work_item=wi, rule_code="BLOCKED_SLA", message=msg, meta=meta))
+            if to_update:
+                RemediationTicket.objects.bulk_update(to_update, ["message", "meta", "updated_at"], batch_size=1000)
+            if to_create:
+                RemediationTicket.objects.bulk_create(to_create, batch_size=1000)
+            touched += len(violations)
 
     return touched
 
@@ -101,9 +177,15 @@ def backfill_blocked_since(board_id: Optional[int] = None, set_to_now_if_missing
     n = 0
     for b in boards:
         qs = WorkItem.objects.filter(board=b, blocked_flag=True, blocked_since__isnull=True)
-        now = timezone.now()
-        for wi in qs[:5000]:
-            wi.blocked_since = wi.dev_started_at or wi.ready_for_qa_at or wi.created_at or (now if set_to_now_if_missing else None)
-            wi.save(update_fields=["blocked_since"])
-            n += 1
+        ids = list(qs.values_list("id", flat=True)[:5000])  # keep the per-run safety cap
+        if not ids:
+            continue
+        # the Python fallback chain maps straight to COALESCE — one UPDATE
+        # for the batch instead of a save() per row
+        sources = ["dev_started_at", "ready_for_qa_at", "created_at"]
+        if set_to_now_if_missing:
+            expr = Coalesce(*sources, Value(timezone.now()))
+        else:
+            expr = Coalesce(*sources)
+        n += WorkItem.objects.filter(id__in=ids).update(blocked_since=expr)
     return n
@@ -1,44 +1,81 @@
 # etl/tasks.py
-from celery import shared_task
+from celery import chain, group, shared_task
+from django.conf import settings
 from django.utils import timezone
 from etl.validator import validate_board
 from metrics.models import Board, RawPayload
 from etl.utils import etl_run, increment
 from etl.registry import get_connector, get_normalizer
+from etl.connectors.base import RawItem
 
 DEFAULT_MAPPING_VERSION = "v1"
 
+# Rows per INSERT when persisting connector output; also the cap on how many
+# raw items are alive in memory at once while streaming.
+RAW_CHUNK_SIZE = int(getattr(settings, "RAW_FETCH_CHUNK_SIZE", 500))
+
 @shared_task(queue="default")
 def etl_fetch_raw(board_id: int, mapping_version: str = DEFAULT_MAPPING_VERSION) -> int:
     board = Board.objects.get(pk=board_id)
     since = board.last_synced
     with etl_run("fetch_raw", board=board, mapping_version=mapping_version, meta={"since": str(since)}) as run:
         connector = get_connector(board)
-        items = connector.fetch_since(since_ts=since)  # list of dicts
-        increment(run, records_pulled=len(items))
-        # store to RawPayload
-        objs = []
+        # Prefer the streaming entry point so we never hold the raw item
+        # dicts and the RawPayload rows in memory at the same time.
+        iter_since = getattr(connector, "iter_since", None)
+        items = iter_since(since_ts=since) if iter_since else connector.fetch_since(since_ts=since)
+        # store to RawPayload in fixed-size chunks: one multi-row INSERT per
+        # RAW_CHUNK_SIZE items, and each chunk is released before the next
+        # window is pulled from the connector.
+        total = 0
+        chunk = []
         for obj in items:
-            objs.append(RawPayload(
+            # Connectors yield slotted RawItem structs; plain dicts are
+            # still accepted for out-of-tree connectors.
+            if isinstance(obj, RawItem):
+                object_type, external_id, payload = obj.object_type, obj.external_id, obj.payload
+            else:
+                object_type = obj.get("object_type", "issue")
+                external_id = str(obj.get("external_id") or "")
+                payload = obj.get("payload") or {}
+            chunk.append(RawPayload(
                 source=board.source,
                 board=board,
-                object_type=obj.get("object_type", "issue"),
-                external_id=str(obj.get("external_id") or ""),
-                payload=obj.get("payload") or {},
+                object_type=object_type,
+                external_id=external_id,
+                payload=payload or {},
                 mapping_version=mapping_version,
             ))
-        if objs:
-            RawPayload.objects.bulk_create(objs, ignore_conflicts=True)
-        return len(items)
+            if len(chunk) >= RAW_CHUNK_SIZE:
+                RawPayload.objects.bulk_create(chunk, batch_size=RAW_CHUNK_SIZE, ignore_conflicts=True)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            RawPayload.objects.bulk_create(chunk, batch_size=RAW_CHUNK_SIZE, ignore_conflicts=True)
+            total += len(chunk)
+        increment(run, records_pulled=total)
+        return total
 
 @shared_task(queue="default")
 def etl_normalize(board_id: int, mapping_version: str = DEFAULT_MAPPING_VERSION) -> int:
+    # stages run on arbitrary workers now, so refresh the per-process mapping
+    # cache here (the stage that reads it) rather than in the orchestrator
+    from etl.normalizers.base import invalidate_mapping_cache
+    invalidate_mapping_cache()
     board = Board.objects.get(pk=board_id)
     with etl_run("normalize", board=board, mapping_version=mapping_version) as run:
-        # get recent raw payloads for this board (last 2 days backstop)
-        recent_raw = RawPayload.objects.filter(board=board).order_by("-fetched_at")[:5000]
+        # get recent raw payloads for this board (last 2 days backstop),
+        # pre-filtered to the normalizer's source/object_type so irrelevant
+        # rows never leave Postgres, and streamed in chunks instead of
+        # materializing the whole slice in worker memory
         normalizer = get_normalizer(board)
-        normalized_count = normalizer.normalize(recent_raw)
+        recent_raw = (
+            RawPayload.objects
+            .filter(board=board, source=normalizer.SOURCE, object_type=normalizer.RAW_OBJECT_TYPE)
+            .order_by("-fetched_at")
+            .only("source", "object_type", "payload")[:5000]
+        )
+        normalized_count = normalizer.normalize(recent_raw.iterator(chunk_size=500))
         increment(run, records_normalized=normalized_count)
         return normalized_count
 
@@ -66,26 +103,32 @@ def etl_snapshot(board_id: int) -> int:
         return 0
 
 @shared_task(queue="default")
-def run_etl_for_board(board_id: int, mapping_version: str = DEFAULT_MAPPING_VERSION) -> dict:
+def bump_last_synced(board_id: int) -> None:
+    Board.objects.filter(pk=board_id).update(last_synced=timezone.now())
+
+@shared_task(queue="default")
+def run_etl_for_board(board_id: int, mapping_version: str = DEFAULT_MAPPING_VERSION) -> str:
     """
-    Orchestrator for a single board: fetch → normalize → validate → snapshot → bump last_synced
+    Orchestrator for a single board: fetch → normalize → validate → snapshot → bump last_synced.
+    Stages run as a Celery chain so each gets its own worker slot instead of
+    serializing all of them (and any tasks prefetched behind them) on this one.
+    Returns the chain's root task id.
     """
-    board = Board.objects.get(pk=board_id)
-    result = {"board": board_id, "fetched": 0, "normalized": 0, "validated": 0, "snapshots": 0}
-    result["fetched"] = etl_fetch_raw(board_id, mapping_version)
-    result["normalized"] = etl_normalize(board_id, mapping_version)
-    result["validated"] = etl_validate(board_id)
-    result["snapshots"] = etl_snapshot(board_id)
-    # bump last_synced
-    Board.objects.filter(pk=board_id).update(last_synced=timezone.now())
-    return result
+    res = chain(
+        etl_fetch_raw.si(board_id, mapping_version),
+        etl_normalize.si(board_id, mapping_version),
+        etl_validate.si(board_id),
+        etl_snapshot.si(board_id),
+        bump_last_synced.si(board_id),
+    ).apply_async()
+    return res.id
 
 @shared_task(queue="default")
 def run_all_boards(mapping_version: str = DEFAULT_MAPPING_VERSION) -> int:
     """
-    Fan-out over all boards; enqueue per-board orchestrations.
+    Fan-out over all boards; enqueue per-board orchestrations as one group.
     """
     ids = list(Board.objects.values_list("id", flat=True))
-    for bid in ids:
-        run_etl_for_board.delay(bid, mapping_version=mapping_version)
+    if ids:
+        group(run_etl_for_board.s(bid, mapping_version) for bid in ids).apply_async()
     return len(ids)
\ No newline at end of file
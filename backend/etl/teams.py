@@ -1,13 +1,34 @@
 from __future__ import annotations
-import requests, json
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
 from django.conf import settings
 
+# Shared session: keep-alive avoids a fresh TCP+TLS handshake per webhook
+# call, and the pool is sized for the concurrent fan-out in notifier.py.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32, pool_maxsize=32,
+    # urllib3 excludes POST from retries by default; allow it explicitly so
+    # 429/5xx actually retry. Worst case is a duplicate Teams card, which is
+    # preferable to silently dropping an alert.
+    max_retries=Retry(total=3, backoff_factor=0.2,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods={"POST"}),
+))
+
 def post_teams_card(webhook_url: str, payload: Dict[str, Any]) -> bool:
     """
     Send a MessageCard to Teams Incoming Webhook.
     """
-    resp = requests.post(webhook_url, json=payload, timeout=(5, 15))
+    # serialize once with orjson and send the bytes body directly instead of
+    # letting requests re-encode via stdlib json
+    body = orjson.dumps(payload)
+    resp = _SESSION.post(webhook_url, data=body,
+                         headers={"Content-Type": "application/json"},
+                         timeout=(5, 15))
     try:
         resp.raise_for_status()
         return True
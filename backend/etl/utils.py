@@ -2,10 +2,23 @@ import traceback as _tb
 from contextlib import contextmanager
 from typing import Optional, Dict, Any
 
-from django.db import transaction
 from metrics.models import Board
 from .models import ETLJobRun, MappingVersion, ETLStatus
 
+# version string -> MappingVersion pk; versions are append-only rows, so a
+# resolved pk never goes stale. Misses are not cached so a version created
+# later is still picked up.
+_mv_pk_cache: Dict[str, int] = {}
+
+def _mapping_version_pk(version: str) -> Optional[int]:
+    pk = _mv_pk_cache.get(version)
+    if pk is None:
+        mv = MappingVersion.objects.filter(version=version).only("id").first()
+        if mv is None:
+            return None
+        pk = _mv_pk_cache[version] = mv.id
+    return pk
+
 @contextmanager
 def etl_run(job_name: str, board: Optional[Board] = None, mapping_version: Optional[str] = None, meta: Optional[Dict[str, Any]] = None):
     """
@@ -16,17 +29,15 @@ def etl_run(job_name: str, board: Optional[Board] = None, mapping_version: Optio
           # ... normalize
           run.records_normalized += normalized_count
     """
-    with transaction.atomic():
-        mv = None
-        if mapping_version:
-            mv = MappingVersion.objects.filter(version=mapping_version).first()
-        run = ETLJobRun.objects.create(
-            job_name=job_name,
-            board=board,
-            mapping_version=mv,
-            status=ETLStatus.STARTED,
-            meta=meta or {},
-        )
+    # single INSERT; autocommit already makes it atomic, and the cached pk
+    # lookup avoids a MappingVersion round-trip per ETL stage entry
+    run = ETLJobRun.objects.create(
+        job_name=job_name,
+        board=board,
+        mapping_version_id=_mapping_version_pk(mapping_version) if mapping_version else None,
+        status=ETLStatus.STARTED,
+        meta=meta or {},
+    )
     try:
         yield run
     except Exception as exc:
@@ -40,8 +51,13 @@ def increment(run: ETLJobRun, **kwargs):
     """
     Convenience to update counters within a run.
     Example: increment(run, records_pulled=+100)
+
+    Deltas accumulate in memory and are flushed in the single UPDATE that
+    closes the run (see ETLJobRun.finalize), so repeated increments don't
+    each cost a DB round-trip.
     """
+    pending = run.__dict__.setdefault("_pending_counters", {})
     for field, delta in kwargs.items():
         if hasattr(run, field):
+            pending[field] = pending.get(field, 0) + (delta or 0)
             setattr(run, field, getattr(run, field) + (delta or 0))
-    run.save()
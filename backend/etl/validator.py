@@ -1,10 +1,11 @@
 # etl/validator.py
 from __future__ import annotations
 import datetime as dt
-from typing import Dict, Any, Iterable, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Q, QuerySet
 from django.conf import settings
 
 from etl.models import MappingVersion
@@ -19,8 +20,7 @@ def _active_cfg() -> Dict[str, Any]:
     root = mv.config if mv else {}
     return root.get("validator", {}) if isinstance(root, dict) else {}
 
-def _cfg(path: List[str], default=None):
-    cfg = _active_cfg()
+def _cfg(cfg: Dict[str, Any], path: List[str], default=None):
     node = cfg
     for k in path:
         if not isinstance(node, dict):
@@ -34,169 +34,248 @@ def _fallback(key: str):
     defaults = getattr(settings, "VALIDATOR_DEFAULTS", {})
     return defaults.get(key)
 
-def _days_ago(d: Optional[dt.datetime]) -> Optional[int]:
+def _days_ago(d: Optional[dt.datetime], now: dt.datetime) -> Optional[int]:
     if not d:
         return None
-    return int((timezone.now() - d).total_seconds() // 86400)
+    return int((now - d).total_seconds() // 86400)
 
 # ----------------------- Ticket helpers --------------------------------------
 
-def open_ticket(board: Board, work_item: Optional[WorkItem], rule_code: str, message: str, meta: Dict[str, Any] | None = None) -> RemediationTicket:
-    """
-    Idempotent: finds an open/in-progress ticket for the same (board, work_item, rule_code) or creates one.
-    If a resolved ticket exists and violation reappears, re-open by creating a new ticket.
-    """
-    meta = meta or {}
-    rt = (RemediationTicket.objects
-          .filter(board=board, work_item=work_item, rule_code=rule_code)
-          .exclude(status=RemediationStatus.DONE)
-          .order_by("-created_at")
-          .first())
-    if rt:
-        # update message/meta if changed
-        changed = False
-        if rt.message != message:
-            rt.message = message
-            changed = True
-        if meta and (rt.meta or {}) != meta:
-            rt.meta = meta
-            changed = True
-        if changed:
-            rt.save(update_fields=["message", "meta"])
+class TicketBatch:
+    """
+    Open-ticket cache plus write buffer for one validate_board pass.
+
+    All open tickets for the board are prefetched into a
+    {(work_item_id, rule_code): ticket} dict; rules mutate in memory via
+    open_ticket/resolve and flush() applies everything with one bulk_create,
+    one bulk_update and one UPDATE — instead of a SELECT (and often a write)
+    per (item, rule) pair.
+    """
+
+    def __init__(self, board: Board):
+        self.board = board
+        self.open: Dict[Tuple[Optional[int], str], RemediationTicket] = {}
+        qs = (RemediationTicket.objects
+              .filter(board=board)
+              .exclude(status=RemediationStatus.DONE)
+              .order_by("-created_at"))
+        for rt in qs:
+            # keep the newest open ticket per key, matching the old
+            # order_by("-created_at").first() lookup
+            self.open.setdefault((rt.work_item_id, rt.rule_code), rt)
+        self._to_create: List[RemediationTicket] = []
+        self._to_update: List[RemediationTicket] = []
+        self._resolve_ids: List[int] = []
+
+    @staticmethod
+    def _key(work_item: Optional[WorkItem], rule_code: str) -> Tuple[Optional[int], str]:
+        return (work_item.id if work_item else None, rule_code)
+
+    def open_ticket(self, work_item: Optional[WorkItem], rule_code: str, message: str, meta: Dict[str, Any] | None = None) -> RemediationTicket:
+        """
+        Idempotent: refreshes the open/in-progress ticket for the same
+        (work_item, rule_code) or buffers a new one. If a resolved ticket
+        exists and the violation reappears, a new ticket is created.
+        """
+        meta = meta or {}
+        key = self._key(work_item, rule_code)
+        rt = self.open.get(key)
+        if rt:
+            changed = False
+            if rt.message != message:
+                rt.message = message
+                changed = True
+            if meta and (rt.meta or {}) != meta:
+                rt.meta = meta
+                changed = True
+            if changed and rt.pk:
+                self._to_update.append(rt)
+            return rt
+
+        rt = RemediationTicket(
+            board=self.board,
+            work_item=work_item,
+            rule_code=rule_code,
+            message=message,
+            meta=meta,
+        )
+        self.open[key] = rt
+        self._to_create.append(rt)
         return rt
 
-    return RemediationTicket.objects.create(
-        board=board,
-        work_item=work_item,
-        rule_code=rule_code,
-        message=message,
-        meta=meta,
-    )
+    def ensure(self, work_item: Optional[WorkItem], rule_code: str, meta: Dict[str, Any], render) -> RemediationTicket:
+        """
+        open_ticket variant keyed on structured meta: when the open ticket
+        already carries the same meta the message is known to be current, so
+        the f-string is never built and no update is buffered. render() is
+        only called for new or changed tickets.
+        """
+        rt = self.open.get(self._key(work_item, rule_code))
+        if rt is not None and (rt.meta or {}) == meta:
+            return rt
+        return self.open_ticket(work_item, rule_code, render(), meta)
 
-def resolve_ticket_if_any(board: Board, work_item: Optional[WorkItem], rule_code: str):
-    q = (RemediationTicket.objects
-         .filter(board=board, work_item=work_item, rule_code=rule_code)
-         .exclude(status=RemediationStatus.DONE))
-    now = timezone.now()
-    for rt in q:
-        rt.status = RemediationStatus.DONE
-        rt.resolved_at = now
-        rt.save(update_fields=["status", "resolved_at"])
+    def resolve(self, work_item: Optional[WorkItem], rule_code: str):
+        rt = self.open.pop(self._key(work_item, rule_code), None)
+        if rt is not None and rt.pk:
+            self._resolve_ids.append(rt.pk)
+
+    def resolve_missing(self, rule_code: str, violator_ids: set):
+        """
+        Resolve every open ticket for rule_code whose work item is not in
+        violator_ids — the set-difference counterpart of rules that only
+        iterate violating rows.
+        """
+        for key, rt in list(self.open.items()):
+            wi_id, code = key
+            if code == rule_code and wi_id not in violator_ids:
+                del self.open[key]
+                if rt.pk:
+                    self._resolve_ids.append(rt.pk)
+
+    def flush(self):
+        now = timezone.now()
+        if self._resolve_ids:
+            (RemediationTicket.objects
+             .filter(id__in=self._resolve_ids)
+             .update(status=RemediationStatus.DONE, resolved_at=now, updated_at=now))
+        if self._to_update:
+            # bulk_update skips auto_now, so bump updated_at by hand — the
+            # notifier keys its recency window on it
+            for rt in self._to_update:
+                rt.updated_at = now
+            RemediationTicket.objects.bulk_update(self._to_update, ["message", "meta", "updated_at"], batch_size=500)
+        if self._to_create:
+            RemediationTicket.objects.bulk_create(self._to_create, batch_size=500)
+        self._to_create, self._to_update, self._resolve_ids = [], [], []
 
 # ----------------------- Rules ------------------------------------------------
 # Each rule returns an integer count of violations for reporting.
+#
+# Rules filter candidates in SQL and only iterate (likely) violating rows;
+# everything else is resolved set-wise via TicketBatch.resolve_missing, so a
+# board with few violations touches few rows regardless of its item count.
 
-def rule_missing_points(board: Board, items: Iterable[WorkItem]) -> int:
+def rule_missing_points(board: Board, items: QuerySet, tickets: TicketBatch, cfg: Dict[str, Any], now: dt.datetime) -> int:
     """
     Require story points for certain item types before status passes dev_started.
     """
-    require_types = set(_cfg(["require_points_for_types"], _fallback("require_points_for_types")) or [])
-    ignore_subtasks = bool(_cfg(["ignore_when_subtask"], _fallback("ignore_when_subtask")))
+    require_types = set(_cfg(cfg, ["require_points_for_types"], _fallback("require_points_for_types")) or [])
+    ignore_subtasks = bool(_cfg(cfg, ["ignore_when_subtask"], _fallback("ignore_when_subtask")))
 
-    count = 0
-    for wi in items:
-        if ignore_subtasks and wi.item_type == ItemType.SUBTASK:
-            resolve_ticket_if_any(board, wi, "MISSING_POINTS")
-            continue
+    q = items.filter(dev_started_at__isnull=False, story_points__isnull=True)
+    if ignore_subtasks:
+        q = q.exclude(item_type=ItemType.SUBTASK)
+
+    violators: set = set()
+    for wi in q.iterator(chunk_size=2000):
         if wi.item_type.lower() not in require_types:
-            resolve_ticket_if_any(board, wi, "MISSING_POINTS")
             continue
-        if wi.dev_started_at and wi.story_points is None:
-            open_ticket(board, wi, "MISSING_POINTS", f"Story points are required before dev starts (item: {wi.source_id}).")
-            count += 1
-        else:
-            resolve_ticket_if_any(board, wi, "MISSING_POINTS")
-    return count
+        tickets.open_ticket(wi, "MISSING_POINTS", f"Story points are required before dev starts (item: {wi.source_id}).")
+        violators.add(wi.id)
+    tickets.resolve_missing("MISSING_POINTS", violators)
+    return len(violators)
 
-def rule_stuck_in_dev(board: Board, items: Iterable[WorkItem]) -> int:
+def rule_stuck_in_dev(board: Board, items: QuerySet, tickets: TicketBatch, cfg: Dict[str, Any], now: dt.datetime) -> int:
     """
     If dev_started_at set but dev_done_at missing for > X days.
     """
-    max_days = int(_cfg(["max_dev_days_without_progress"], _fallback("max_dev_days_without_progress")) or 4)
-    count = 0
-    for wi in items:
-        if wi.dev_started_at and not wi.dev_done_at and not wi.closed:
-            days = _days_ago(wi.dev_started_at) or 0
-            if days > max_days:
-                open_ticket(board, wi, "STUCK_IN_DEV", f"Dev in progress for {days} days (> {max_days}).")
-                count += 1
-            else:
-                resolve_ticket_if_any(board, wi, "STUCK_IN_DEV")
-        else:
-            resolve_ticket_if_any(board, wi, "STUCK_IN_DEV")
-    return count
-
-def rule_waiting_for_qa(board: Board, items: Iterable[WorkItem]) -> int:
+    max_days = int(_cfg(cfg, ["max_dev_days_without_progress"], _fallback("max_dev_days_without_progress")) or 4)
+    threshold = now - dt.timedelta(days=max_days)
+    q = items.filter(closed=False, dev_started_at__isnull=False,
+                     dev_done_at__isnull=True, dev_started_at__lt=threshold)
+
+    violators: set = set()
+    for wi in q.iterator(chunk_size=2000):
+        days = _days_ago(wi.dev_started_at, now) or 0
+        if days > max_days:  # keep the whole-day boundary the old loop used
+            tickets.ensure(wi, "STUCK_IN_DEV", {"days": days, "max_days": max_days},
+                           lambda: f"Dev in progress for {days} days (> {max_days}).")
+            violators.add(wi.id)
+    tickets.resolve_missing("STUCK_IN_DEV", violators)
+    return len(violators)
+
+def rule_waiting_for_qa(board: Board, items: QuerySet, tickets: TicketBatch, cfg: Dict[str, Any], now: dt.datetime) -> int:
     """
     Ready for QA > X days without qa_started_at.
     """
-    max_days = int(_cfg(["max_ready_for_qa_days"], _fallback("max_ready_for_qa_days")) or 2)
-    count = 0
-    for wi in items:
-        if wi.ready_for_qa_at and not wi.qa_started_at and not wi.closed:
-            days = _days_ago(wi.ready_for_qa_at) or 0
-            if days > max_days:
-                open_ticket(board, wi, "WAITING_FOR_QA", f"In 'Ready for QA' for {days} days (> {max_days}).")
-                count += 1
-            else:
-                resolve_ticket_if_any(board, wi, "WAITING_FOR_QA")
-        else:
-            resolve_ticket_if_any(board, wi, "WAITING_FOR_QA")
-    return count
-
-def rule_stuck_in_qa(board: Board, items: Iterable[WorkItem]) -> int:
+    max_days = int(_cfg(cfg, ["max_ready_for_qa_days"], _fallback("max_ready_for_qa_days")) or 2)
+    threshold = now - dt.timedelta(days=max_days)
+    q = items.filter(closed=False, ready_for_qa_at__isnull=False,
+                     qa_started_at__isnull=True, ready_for_qa_at__lt=threshold)
+
+    violators: set = set()
+    for wi in q.iterator(chunk_size=2000):
+        days = _days_ago(wi.ready_for_qa_at, now) or 0
+        if days > max_days:
+            tickets.ensure(wi, "WAITING_FOR_QA", {"days": days, "max_days": max_days},
+                           lambda: f"In 'Ready for QA' for {days} days (> {max_days}).")
+            violators.add(wi.id)
+    tickets.resolve_missing("WAITING_FOR_QA", violators)
+    return len(violators)
+
+def rule_stuck_in_qa(board: Board, items: QuerySet, tickets: TicketBatch, cfg: Dict[str, Any], now: dt.datetime) -> int:
     """
     QA started but not verified/done for > X days.
     """
-    max_days = int(_cfg(["max_qa_days"], _fallback("max_qa_days")) or 3)
-    count = 0
-    for wi in items:
-        if wi.qa_started_at and not (wi.qa_verified_at or wi.signed_off_at or wi.done_at):
-            days = _days_ago(wi.qa_started_at) or 0
-            if days > max_days:
-                open_ticket(board, wi, "STUCK_IN_QA", f"QA in progress for {days} days (> {max_days}).")
-                count += 1
-            else:
-                resolve_ticket_if_any(board, wi, "STUCK_IN_QA")
-        else:
-            resolve_ticket_if_any(board, wi, "STUCK_IN_QA")
-    return count
-
-def rule_blocked_reason(board: Board, items: Iterable[WorkItem]) -> int:
+    max_days = int(_cfg(cfg, ["max_qa_days"], _fallback("max_qa_days")) or 3)
+    threshold = now - dt.timedelta(days=max_days)
+    q = items.filter(qa_started_at__isnull=False, qa_verified_at__isnull=True,
+                     signed_off_at__isnull=True, done_at__isnull=True,
+                     qa_started_at__lt=threshold)
+
+    violators: set = set()
+    for wi in q.iterator(chunk_size=2000):
+        days = _days_ago(wi.qa_started_at, now) or 0
+        if days > max_days:
+            tickets.ensure(wi, "STUCK_IN_QA", {"days": days, "max_days": max_days},
+                           lambda: f"QA in progress for {days} days (> {max_days}).")
+            violators.add(wi.id)
+    tickets.resolve_missing("STUCK_IN_QA", violators)
+    return len(violators)
+
+def rule_blocked_reason(board: Board, items: QuerySet, tickets: TicketBatch, cfg: Dict[str, Any], now: dt.datetime) -> int:
     """
     If blocked_flag is true, require blocked_reason non-empty.
     """
-    count = 0
-    for wi in items:
-        if wi.blocked_flag and not (wi.blocked_reason or "").strip():
-            open_ticket(board, wi, "BLOCKED_NO_REASON", "Work item is blocked but no blocked_reason is provided.")
-            count += 1
-        else:
-            resolve_ticket_if_any(board, wi, "BLOCKED_NO_REASON")
-    return count
+    violators: set = set()
+    # whitespace-only reasons still count as missing, so trim in Python on
+    # the (small) blocked subset
+    for wi in items.filter(blocked_flag=True).iterator(chunk_size=2000):
+        if not (wi.blocked_reason or "").strip():
+            tickets.open_ticket(wi, "BLOCKED_NO_REASON", "Work item is blocked but no blocked_reason is provided.")
+            violators.add(wi.id)
+    tickets.resolve_missing("BLOCKED_NO_REASON", violators)
+    return len(violators)
 
-def rule_pr_required(board: Board, items: Iterable[WorkItem]) -> int:
+def rule_pr_required(board: Board, items: QuerySet, tickets: TicketBatch, cfg: Dict[str, Any], now: dt.datetime) -> int:
     """
     If status indicates code work (Dev/Ready for QA/etc.) then require at least one linked PR (from C-03 GH normalizer).
     Only for certain item types.
     """
-    require_types = set(_cfg(["require_pr_for_types"], _fallback("require_pr_for_types")) or [])
-    keywords = [k.lower() for k in (_cfg(["pr_required_when_status_contains"], _fallback("pr_required_when_status_contains")) or [])]
+    require_types = set(_cfg(cfg, ["require_pr_for_types"], _fallback("require_pr_for_types")) or [])
+    keywords = [k.lower() for k in (_cfg(cfg, ["pr_required_when_status_contains"], _fallback("pr_required_when_status_contains")) or [])]
+    if not keywords:
+        tickets.resolve_missing("PR_REQUIRED", set())
+        return 0
+
+    status_q = Q()
+    for kw in keywords:
+        status_q |= Q(status__icontains=kw)
+    q = items.filter(status_q)
 
-    count = 0
-    for wi in items:
+    violators: set = set()
+    for wi in q.iterator(chunk_size=2000):
         if wi.item_type.lower() not in require_types:
-            resolve_ticket_if_any(board, wi, "PR_REQUIRED")
             continue
         status = (wi.status or "").lower()
-        needs_pr = any(kw in status for kw in keywords)
-        has_pr = bool(wi.linked_prs)
-        if needs_pr and not has_pr:
-            open_ticket(board, wi, "PR_REQUIRED", f"Status is '{wi.status}' but no linked PR found.")
-            count += 1
-        else:
-            resolve_ticket_if_any(board, wi, "PR_REQUIRED")
-    return count
+        if not any(kw in status for kw in keywords):
+            continue
+        if not wi.linked_prs:
+            tickets.open_ticket(wi, "PR_REQUIRED", f"Status is '{wi.status}' but no linked PR found.")
+            violators.add(wi.id)
+    tickets.resolve_missing("PR_REQUIRED", violators)
+    return len(violators)
 
 # ----------------------- Runner ------------------------------------------------
 
@@ -222,7 +301,13 @@ def validate_board(board: Board) -> Dict[str, int]:
     )
     # Most rules ignore closed items implicitly; keep them in queryset, rules check .closed
 
+    tickets = TicketBatch(board)
+    # one MappingVersion query per run; rules read from the resolved dict
+    cfg = _active_cfg()
+    # one clock read shared by every rule's thresholds and day math
+    now = timezone.now()
     results: Dict[str, int] = {}
     for code, func in ALL_RULES:
-        results[code] = int(func(board, items))
+        results[code] = int(func(board, items, tickets, cfg, now))
+    tickets.flush()
     return results
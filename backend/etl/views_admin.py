@@ -66,29 +66,37 @@ class AdminETLJobsListView(APIView):
     def get(self, request):
         s = JobsListQuerySerializer(data=request.query_params)
         s.is_valid(raise_exception=True)
-        q = ETLJobRun.objects.all().select_related("board").order_by("-created_at")
+        # newest-first on started_at (set at creation) so the sort is served
+        # by the started_at indexes instead of filesorting created_at
+        q = ETLJobRun.objects.all().order_by("-started_at")
         v = s.validated_data
         if v.get("board_id"): q = q.filter(board_id=v["board_id"])
         if v.get("stage"):    q = q.filter(stage__iexact=v["stage"])
         if v.get("status"):   q = q.filter(status__iexact=v["status"])
         total = q.count()
         offset = v["offset"]; limit = v["limit"]
-        rows = q[offset: offset+limit]
-        def row_dict(r):
-            return {
-                "id": r.id,
-                "board_id": getattr(r.board, "id", None),
-                "board": getattr(r.board, "name", None),
-                "stage": getattr(r, "stage", None),
-                "status": getattr(r, "status", None),
-                "task_id": getattr(r, "task_id", None),
-                "created_at": getattr(r, "created_at", None),
-                "started_at": getattr(r, "started_at", None),
-                "finished_at": getattr(r, "finished_at", None),
-                "meta": getattr(r, "meta", None),
-                "error": getattr(r, "error", None),
-            }
-        return Response({"total": total, "results": [row_dict(r) for r in rows]})
+        # project straight to dicts — no ETLJobRun/Board instances for a
+        # read-only listing; board name comes through the JOIN. stage/task_id/
+        # error are not ETLJobRun fields: keep them as the literal Nones the
+        # old getattr(..., None) emitted so the response shape is unchanged.
+        rows = q.values(
+            "id", "board_id", "board__name", "status",
+            "created_at", "started_at", "finished_at", "meta",
+        )[offset: offset + limit]
+        results = [{
+            "id": r["id"],
+            "board_id": r["board_id"],
+            "board": r["board__name"],
+            "stage": None,
+            "status": r["status"],
+            "task_id": None,
+            "created_at": r["created_at"],
+            "started_at": r["started_at"],
+            "finished_at": r["finished_at"],
+            "meta": r["meta"],
+            "error": None,
+        } for r in rows]
+        return Response({"total": total, "results": results})
 
 # ---------- Job detail ----------
 class AdminETLJobDetailView(APIView):
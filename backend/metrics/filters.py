@@ -1,5 +1,7 @@
 from __future__ import annotations
 import django_filters as df
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import F, Func, IntegerField
 from django.utils.dateparse import parse_datetime
 from .models import WorkItem
 
@@ -39,7 +41,9 @@ class WorkItemFilter(df.FilterSet):
         fields = []
 
     def filter_assignee(self, qs, name, value):
-        return qs.filter(assignees__icontains=value)
+        # array containment (@>) hits wi_assignees_gin and matches whole
+        # entries, unlike the old ILIKE which also caught substrings
+        return qs.filter(assignees__contains=[value])
 
     def filter_has_points(self, qs, name, value: bool):
         if value is True:  return qs.exclude(story_points__isnull=True)
@@ -52,10 +56,15 @@ class WorkItemFilter(df.FilterSet):
         return qs
 
     def filter_has_pr(self, qs, name, value: bool):
-        if value is True:  return qs.exclude(linked_prs__isnull=True).exclude(linked_prs=[])
-        if value is False: return qs.filter(linked_prs__isnull=True) | qs.filter(linked_prs=[])
+        # single jsonb_array_length predicate (matches wi_prs_len_idx)
+        # instead of an OR of isnull/empty-list branches
+        n_prs = Func(F("linked_prs"), function="jsonb_array_length", output_field=IntegerField())
+        if value is True:  return qs.annotate(n_prs=n_prs).filter(n_prs__gt=0)
+        if value is False: return qs.annotate(n_prs=n_prs).filter(n_prs=0)
         return qs
 
     def filter_q(self, qs, name, value):
         if not value: return qs
-        return qs.filter(title__icontains=value) | qs.filter(description__icontains=value)
+        # GIN-indexed full-text lookup on the stored search_vector column
+        # instead of two unindexable ILIKE '%...%' scans
+        return qs.filter(search_vector=SearchQuery(value, config="english"))
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 
 
 # ----- Helpers / choices ------------------------------------------------------
@@ -121,6 +123,14 @@ class WorkItem(models.Model):
     meta = models.JSONField(default=dict, blank=True)                # per-source extra fields
     last_synced = models.DateTimeField(auto_now=True)
 
+    # stored tsvector over title+description; kept current by the database,
+    # queried by WorkItemFilter.filter_q via SearchQuery
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", "description", config="english"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     class Meta:
         indexes = [
             models.Index(fields=["board", "sprint_id"]),
@@ -129,6 +139,12 @@ class WorkItem(models.Model):
             models.Index(fields=["dev_owner"]),
             models.Index(fields=["qa_owner"]),
             models.Index(fields=["done_at"]),
+            # expression index backing the has_pr filter's
+            # jsonb_array_length(linked_prs) predicate
+            models.Index(models.Func("linked_prs", function="jsonb_array_length"),
+                         name="wi_prs_len_idx"),
+            GinIndex(fields=["search_vector"], name="wi_search_gin"),
+            GinIndex(fields=["assignees"], name="wi_assignees_gin"),
         ]
 
     def __str__(self) -> str:
@@ -251,6 +267,7 @@ class RemediationTicket(models.Model):
     status = models.CharField(max_length=16, choices=RemediationStatus.choices, default=RemediationStatus.OPEN)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
     meta = models.JSONField(default=dict, blank=True)
     # Lightweight ops fields (optional)
@@ -262,6 +279,14 @@ class RemediationTicket(models.Model):
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["created_at"]),
+            # exact access path of the validator/SLA idempotency lookups
+            models.Index(fields=["board", "work_item", "rule_code", "status"],
+                         name="rt_idem_idx"),
+            # partial index over open tickets only — the set validate_board
+            # prefetches and notifier digests scan
+            models.Index(fields=["board", "rule_code", "work_item"],
+                         name="rt_open_idx",
+                         condition=~models.Q(status=RemediationStatus.DONE)),
         ]
 
     def __str__(self) -> str:
@@ -1,9 +1,9 @@
+from __future__ import annotations
 from rest_framework import viewsets
 from users.permissions import HasRole
 from users.models import Roles
 from .models import Board
 from .serializers import BoardSerializer, DateRangeSerializer, LeaderboardParamsSerializer
-from __future__ import annotations
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated